@@ -0,0 +1,266 @@
+"""HTTP/JSON-сервис расчёта налогов для интеграций (ERP и т. п.).
+
+Те же расчёты, что и в шести калькуляторах, без сессии Streamlit: ставки
+берутся из индексов в памяти процесса (tax_engine / workbook).
+
+Запуск на стандартной библиотеке:
+
+    python api.py --port 8000
+
+или через любой ASGI-сервер:
+
+    uvicorn api:app
+
+Маршруты:
+    GET  /health                    — проверка живости
+    GET  /warmup                    — прогрев кешей с разбивкой времени (см. warmup.py)
+    GET  /metrics[?format=json]     — гистограммы замеров (Prometheus; см. metrics.py)
+    GET  /memory                    — байты листов и таблиц в кеше книги (см. workbook.py)
+    GET  /cache                     — попадания и промахи кеша результатов (см. result_cache.py)
+    GET  /taxes                     — список налогов
+    GET  /options/<налог>[?prefix=] — варианты ключей (prefix — уже выбранные значения)
+    POST /calculate/<налог>         — {"key": "..." | [...], "quantity": 1.0}
+                                      (для oil key может быть ценой: {"key": 700.0, ...})
+    POST /batch                     — {"items": [{"tax": ..., "key": ..., "quantity": ...}, ...]}
+"""
+
+import argparse
+import json
+import math
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+import result_cache
+from tax_engine import TAX_TYPES, rate_table
+from warmup import prime
+from workbook import memory_report, start_watcher
+
+MAX_BODY = 32 * 1024 * 1024
+MAX_BATCH_ITEMS = 100_000
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _finite(value, message):
+    """float(value) или ApiError(400, message): NaN, Infinity и целые за пределами float."""
+    try:
+        number = float(value)
+    except OverflowError:
+        number = math.inf
+    if not math.isfinite(number):
+        raise ApiError(400, message)
+    return number
+
+
+def _quantity(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ApiError(400, "quantity должно быть числом")
+    value = _finite(value, "quantity должно быть конечным числом")
+    if value < 0:
+        raise ApiError(400, "quantity не может быть отрицательным")
+    return value
+
+
+def _key(value):
+    """Ключ ставки: строка, число или плоский список строк и чисел."""
+    values = value if isinstance(value, list) else [value]
+    for item in values:
+        if isinstance(item, bool) or not isinstance(item, (str, int, float)):
+            raise ApiError(400, "key должен быть строкой, числом или списком строк и чисел")
+        if not isinstance(item, str):
+            _finite(item, "key должен быть конечным числом")
+    return value
+
+
+def _content_length(value):
+    """Длина тела из заголовка Content-Length (нет заголовка — 0)."""
+    try:
+        length = int(value or 0)
+    except ValueError:
+        raise ApiError(400, "Некорректный Content-Length")
+    if length < 0:
+        raise ApiError(400, "Некорректный Content-Length")
+    if length > MAX_BODY:
+        raise ApiError(413, "Слишком большой запрос")
+    return length
+
+
+def _calculate_item(tax, item):
+    if not isinstance(item, dict):
+        raise ApiError(400, "Ожидается JSON-объект")
+    if tax not in TAX_TYPES:
+        raise ApiError(404, f"Неизвестный налог: {tax}")
+    if "key" not in item:
+        raise ApiError(400, "Не указан key")
+    try:
+        cached = result_cache.cached_calculate(tax, _key(item["key"]), _quantity(item.get("quantity", 1.0)))
+    except ValueError as e:
+        raise ApiError(400, str(e))
+    if cached is None:
+        raise ApiError(404, "Ставки для указанного ключа не найдены")
+    result = asdict(cached.result)
+    if any(isinstance(v, float) and not math.isfinite(v) for v in result.values()):
+        # Например, quantity около 1e308: налог не помещается в float
+        raise ApiError(400, "Результат расчёта вне диапазона чисел")
+    return result
+
+
+def _batch(body):
+    items = body.get("items") if isinstance(body, dict) else None
+    if not isinstance(items, list):
+        raise ApiError(400, "Ожидается {\"items\": [...]}")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise ApiError(413, f"Не более {MAX_BATCH_ITEMS} позиций за запрос")
+
+    results = []
+    errors = 0
+    for item in items:
+        try:
+            tax = item.get("tax") if isinstance(item, dict) else None
+            results.append({"ok": True, "result": _calculate_item(tax, item)})
+        except ApiError as e:
+            errors += 1
+            results.append({"ok": False, "error": str(e)})
+    return {"count": len(results), "errors": errors, "results": results}
+
+
+def handle(method, path, query=None, body=None):
+    """Маршрутизация запроса. Возвращает (HTTP-статус, JSON-совместимый ответ).
+
+    Строка вместо JSON-объекта отдаётся как text/plain (формат Prometheus).
+    """
+    parts = [p for p in path.split("/") if p]
+    try:
+        if method == "GET" and parts == ["health"]:
+            return 200, {"status": "ok"}
+        if method == "GET" and parts == ["warmup"]:
+            return 200, prime()
+        if method == "GET" and parts == ["metrics"]:
+            if (query or {}).get("format") == ["json"]:
+                return 200, metrics.as_dict()
+            return 200, metrics.prometheus_text() + result_cache.prometheus_text()
+        if method == "GET" and parts == ["memory"]:
+            return 200, {"objects": memory_report()}
+        if method == "GET" and parts == ["cache"]:
+            return 200, result_cache.stats()
+        if method == "GET" and parts == ["taxes"]:
+            return 200, {"taxes": list(TAX_TYPES)}
+        if method == "GET" and len(parts) == 2 and parts[0] == "options":
+            if parts[1] not in TAX_TYPES:
+                raise ApiError(404, f"Неизвестный налог: {parts[1]}")
+            prefix = (query or {}).get("prefix", [])
+            return 200, {"options": list(rate_table(parts[1]).options(*prefix))}
+        if method == "POST" and len(parts) == 2 and parts[0] == "calculate":
+            return 200, _calculate_item(parts[1], body)
+        if method == "POST" and parts == ["batch"]:
+            return 200, _batch(body)
+        raise ApiError(404, "Маршрут не найден")
+    except ApiError as e:
+        return e.status, {"error": str(e)}
+
+
+def _decode(raw):
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ApiError(400, "Некорректный JSON")
+
+
+def _encode(payload):
+    """(тело, Content-Type) ответа."""
+    if isinstance(payload, str):
+        return payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8"), "application/json; charset=utf-8"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, status, payload):
+        data, content_type = _encode(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        try:
+            length = _content_length(self.headers.get("Content-Length"))
+            body = _decode(self.rfile.read(length)) if length else None
+        except ApiError as e:
+            self.close_connection = True
+            return self._respond(e.status, {"error": str(e)})
+        self._respond(*handle(method, url.path, parse_qs(url.query), body))
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        # Журнал каждого запроса заметно замедляет пакетные вызовы
+        pass
+
+
+async def app(scope, receive, send):
+    """ASGI-приложение поверх той же маршрутизации."""
+    if scope["type"] != "http":
+        return
+    chunks = []
+    more = True
+    while more:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more = message.get("more_body", False)
+    try:
+        body = _decode(b"".join(chunks))
+        status, payload = handle(
+            scope["method"], scope["path"], parse_qs(scope.get("query_string", b"").decode()), body
+        )
+    except ApiError as e:
+        status, payload = e.status, {"error": str(e)}
+    data, content_type = _encode(payload)
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(data)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": data})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON API калькуляторов налогов")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    # Книга и индексы загружаются до первого запроса, замена книги — без перезапуска
+    prime()
+    start_watcher()
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"API: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,40 @@
 import streamlit as st
-import pandas as pd
-import time
 
-# Получаем параметры URL
-query_params = st.experimental_get_query_params()
+from ui import show_rate_report_sidebar
+from warmup import prime
+from workbook import start_watcher
 
-# Проверяем, это запрос для прогрева
-if "_warmup" in query_params:
-    # Минимальный ответ для прогрева
-    st.write("OK")
-    
-    # Небольшая пауза, чтобы убедиться, что приложение запущено
-    time.sleep(1)
-    
-    # Останавливаем дальнейшее выполнение
-    st.stop()
+# Все калькуляторы — страницы одного приложения: один процесс, одна загрузка
+# книги и общие индексы ставок (workbook.py) для всех страниц и сессий.
+# Каждую страницу по-прежнему можно запустить отдельно: streamlit run excise_tax.py
 
-# Заголовок
-st.title("Калькулятор земельного налога (Беларусь, 2025–2026)")
+# Проверяем, это запрос для прогрева (параметр URL ?_warmup)
+if "_warmup" in st.query_params:
+    # Заполняем общие кеши: книга, индексы ставок, по одному расчёту на налог
+    st.json(prime())
 
-# Загрузка данных
-@st.cache_data
-def load_data():
-    df = pd.read_excel("Налоги_таблицы.xlsx", sheet_name="Земельный налог")
-    return df
-
-try:
-    df = load_data()
-except FileNotFoundError:
-    st.error("Файл 'Налоги_таблицы.xlsx' не найден.")
-    st.stop()
-except Exception as e:
-    st.error(f"Ошибка при загрузке Excel: {e}")
+    # Останавливаем дальнейшее выполнение
     st.stop()
 
-# Уникальные категории — можно сортировать
-categories = sorted(df["Категория сельхозугодий"].unique())
-
-# Классы — сохраняем ПОРЯДОК из таблицы (без sort!)
-seen = set()
-classes = []
-for val in df["Кадастровая оценка земель (общий балл)"]:
-    if val not in seen:
-        classes.append(val)
-        seen.add(val)
-
-# Ввод пользователя
-st.subheader("Выберите параметры сельхозугодий")
-
-col1, col2 = st.columns(2)
-with col1:
-    category = st.selectbox("Категория сельхозугодий", categories)
-with col2:
-    klass = st.selectbox("Кадастровая оценка земель (общий балл)", classes)
-
-area = st.number_input("Площадь, га", min_value=0.1, value=1.0, step=0.1)
-
-# Поиск ставок
-match = df[
-    (df["Категория сельхозугодий"] == category) &
-    (df["Кадастровая оценка земель (общий балл)"] == klass)
-]
-
-if match.empty:
-    st.warning("Не найдено ставок для выбранной комбинации.")
-else:
-    row = match.iloc[0]
-    stavka_2025 = row["Ставки_2025"]
-    stavka_2026 = row["Ставки_2026"]
-    
-    tax_2025 = stavka_2025 * area
-    tax_2026 = stavka_2026 * area
-    growth_abs = tax_2026 - tax_2025
-    growth_pct = (growth_abs / tax_2025 * 100) if tax_2025 > 0 else 0
-
-    # Вывод результатов
-    st.subheader("Результаты расчёта")
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Налог 2025", f"{tax_2025:.2f} BYN")
-    with col2:
-        st.metric("Налог 2026", f"{tax_2026:.2f} BYN")
-    with col3:
-        st.metric("Рост", f"{growth_abs:.2f} BYN", delta=f"+{growth_pct:.1f}%")
-
-    # Детали
-    with st.expander("Детали"):
-        st.write(f"**Ставка 2025:** {stavka_2025} BYN/га")
-        st.write(f"**Ставка 2026:** {stavka_2026} BYN/га")
-        st.write(f"**Площадь:** {area} га")
-
+# Замена Налоги_таблицы.xlsx подхватывается без перезапуска (один поток на процесс)
+start_watcher()
+
+pages = {
+    "Калькуляторы": [
+        st.Page("land_tax_calculator.py", title="Земельный налог", default=True),
+        st.Page("tax_calculator.py", title="Транспортный налог", url_path="transport"),
+        st.Page("excise_tax.py", title="Акцизы", url_path="excise"),
+        st.Page("eco_tax_calculator.py", title="Экологический налог", url_path="eco"),
+        st.Page("oil_tax_calculator.py", title="Добыча нефти", url_path="oil"),
+        st.Page("mining_tax_calculator.py", title="Добыча природных ресурсов", url_path="mining"),
+    ],
+    "Планирование": [
+        st.Page("portfolio_calculator.py", title="Сводный расчёт", url_path="portfolio"),
+        st.Page("scenario_calculator.py", title="Сценарии", url_path="scenarios"),
+    ],
+}
+
+page = st.navigation(pages)
+# Общая выгрузка для всех страниц — под меню
+show_rate_report_sidebar()
+page.run()
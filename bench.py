@@ -0,0 +1,355 @@
+"""Бенчмарки калькуляторов: загрузка книги, поиск ставок, перезапуск скриптов.
+
+    python bench.py                          # всё, результат в JSON на stdout
+    python bench.py --output run.json        # сохранить результат
+    python bench.py --enlarge 100            # загрузка на копии книги, увеличенной в 100 раз
+    python bench.py --scaling 10000 100000 1000000
+    python bench.py --diff old.json new.json # сравнить два прогона
+
+Разделы результата:
+    load     — холодное чтение каждого листа через openpyxl, снимок, тёплый кеш
+    lookup   — поиск ставки: булева маска pandas против RateTable
+    rerun    — полный прогон каждой страницы-калькулятора через streamlit AppTest
+    scaling  — те же поиски на листах, увеличенных до 10^4–10^6 строк
+    memory   — байты каждого листа и таблицы ставок в кеше книги
+    startup  — холодный старт каждой страницы в новом процессе: время импортов
+               по пакетам (python -X importtime) и первый прогон скрипта
+
+    python bench.py --startup                # только холодный старт, таблицей
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import snapshot
+import workbook
+from rates import RateTable
+from tables import BUILDERS
+
+SCRIPTS = [
+    "land_tax_calculator.py",
+    "tax_calculator.py",
+    "excise_tax.py",
+    "eco_tax_calculator.py",
+    "oil_tax_calculator.py",
+    "mining_tax_calculator.py",
+]
+
+# Лист и ключевые колонки каждой таблицы ставок — для поиска булевой маской
+LOOKUP_SHEETS = {
+    "land": "Земельный налог",
+    "transport": "Транспортный",
+    "excise": "Акцизы",
+    "eco_air": "Эконалог_воздух",
+    "eco_water": "Эконалог_сточные",
+    "eco_waste": "Эконалог_захоронение",
+    "oil": "Ставки на нефть",
+    "mining": "Добыча_ресурсов",
+}
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 4)
+
+
+def _timeit(fn, repeat=5, number=1):
+    """Медиана и минимум времени одного вызова, мс."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {"median_ms": _ms(statistics.median(samples)), "min_ms": _ms(min(samples))}
+
+
+def bench_load(path):
+    result = {"sheets": {}}
+    with pd.ExcelFile(path) as book:
+        names = book.sheet_names
+    for name in names:
+        # Холодно: как делали калькуляторы — отдельный read_excel на лист
+        result["sheets"][name] = _timeit(lambda: pd.read_excel(path, sheet_name=name), repeat=3)
+    result["openpyxl_all_sheets"] = _timeit(lambda: pd.read_excel(path, sheet_name=None), repeat=3)
+
+    digest = snapshot.workbook_hash(path)
+    if snapshot.read_snapshot(path, digest) is None:
+        snapshot.compile_snapshot(path, digest)
+    result["hash"] = _timeit(lambda: snapshot.workbook_hash(path))
+    result["snapshot_all_sheets"] = _timeit(lambda: snapshot.read_snapshot(path, digest))
+    # Листы снимка собираются в DataFrame лениво — здесь все сразу
+    result["snapshot_decode_sheets"] = _timeit(lambda: dict(snapshot.read_snapshot(path, digest)[0]))
+
+    workbook.load_workbook(path)
+    result["warm_cache"] = _timeit(lambda: workbook.load_workbook(path), number=1000)
+    result["build_indexes"] = _timeit(
+        lambda: [build(workbook.load_workbook(path)["sheets"]) for build in BUILDERS.values()]
+    )
+    return result
+
+
+def _mask_lookup(df, key_columns, key):
+    mask = np.ones(len(df), dtype=bool)
+    for col, value in zip(key_columns, key):
+        mask &= (df[col] == value).to_numpy()
+    row = df[mask].iloc[0]
+    return row
+
+
+def bench_lookup(path, number=200):
+    result = {}
+    sheets = workbook.load_workbook(path)["sheets"]
+    for name, sheet in LOOKUP_SHEETS.items():
+        table = BUILDERS[name](sheets)
+        if not len(table):
+            continue
+        key = table.keys[len(table) // 2]
+        df = sheets[sheet]
+        if name == "eco_waste":
+            df = df.assign(**{table.key_columns[1]: [k[1] for k in table.keys]})
+        if all(col in df.columns for col in table.key_columns):
+            pandas_mask = _timeit(lambda: _mask_lookup(df, table.key_columns, key), number=number)
+        else:
+            pandas_mask = None
+        result[name] = {
+            "rows": len(table),
+            "pandas_mask": pandas_mask,
+            "rate_table": _timeit(lambda: table.lookup(*key), number=number * 50),
+        }
+    return result
+
+
+def bench_memory(path):
+    for name in BUILDERS:
+        workbook.get_rate_table(name, path)
+    return {row["Объект"]: {"kind": row["Вид"], "rows": row["Строк"], "bytes": row["Байт"]}
+            for row in workbook.memory_report(path)}
+
+
+def bench_rerun(scripts, repeat=5):
+    from streamlit.testing.v1 import AppTest
+
+    result = {}
+    root = os.path.dirname(os.path.abspath(__file__))
+    for script in scripts:
+        app = AppTest.from_file(os.path.join(root, script), default_timeout=120)
+        started = time.perf_counter()
+        app.run()
+        first = time.perf_counter() - started
+        if app.exception:
+            result[script] = {"error": str(app.exception[0].value)}
+            continue
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            app.run()
+            samples.append(time.perf_counter() - started)
+        result[script] = {
+            "first_run_ms": _ms(first),
+            "rerun_median_ms": _ms(statistics.median(samples)),
+            "rerun_min_ms": _ms(min(samples)),
+        }
+    return result
+
+
+# Прогон страницы без сервера Streamlit (bare mode): время и тяжёлые модули
+_STARTUP_CODE = """
+import json, runpy, sys, time
+error = None
+started = time.perf_counter()
+try:
+    runpy.run_path(sys.argv[1], run_name="__main__")
+except BaseException as e:
+    error = repr(e)
+elapsed = time.perf_counter() - started
+heavy = [m for m in ("pandas", "openpyxl", "pyarrow", "numpy", "altair") if m in sys.modules]
+print(json.dumps({"seconds": elapsed, "heavy": heavy, "error": error}))
+"""
+
+
+def bench_startup(scripts, path=None, top=8):
+    """Холодный старт страниц: каждая — в новом процессе с python -X importtime.
+
+    Снимок книги собирается заранее, как на сервере после первого запуска.
+    """
+    workbook.load_workbook(path or snapshot.WORKBOOK_PATH)
+    result = {}
+    root = os.path.dirname(os.path.abspath(__file__))
+    for script in scripts:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _STARTUP_CODE, os.path.join(root, script)],
+            capture_output=True,
+            text=True,
+            cwd=root,
+        )
+        packages = {}
+        for line in proc.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            own, _, name = line[len("import time:"):].split("|")
+            if not own.strip().isdigit():
+                continue
+            package = name.strip().split(".")[0]
+            packages[package] = packages.get(package, 0) + int(own)
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        ranked = sorted(packages.items(), key=lambda item: -item[1])
+        result[script] = {
+            "first_run_ms": _ms(run["seconds"]),
+            "imports_ms": _ms(sum(packages.values()) / 1e6),
+            "heavy_modules": run["heavy"],
+            "error": run["error"],
+            "top_packages_ms": {name: _ms(us / 1e6) for name, us in ranked[:top]},
+        }
+    return result
+
+
+def print_startup(report):
+    for script, data in report.items():
+        print(
+            f"{script}: первый прогон {data['first_run_ms']:.0f} мс, импорты {data['imports_ms']:.0f} мс, "
+            f"тяжёлые модули: {', '.join(data['heavy_modules']) or 'нет'}"
+        )
+        if data["error"]:
+            print(f"    ошибка: {data['error']}")
+        for name, ms in data["top_packages_ms"].items():
+            print(f"    {name:30s} {ms:8.1f} мс")
+
+
+def _enlarge_frame(df, rows, key_columns):
+    """Лист, размноженный до rows строк; ключи делаются уникальными суффиксом."""
+    reps = -(-rows // max(len(df), 1))
+    big = pd.concat([df] * reps, ignore_index=True).iloc[:rows]
+    suffix = pd.Series(np.arange(len(big)) // max(len(df), 1)).astype(str)
+    for col in key_columns[-1:]:
+        big[col] = big[col].astype(str) + " #" + suffix
+    return big
+
+
+def bench_scaling(path, sizes):
+    result = {}
+    sheets = workbook.load_workbook(path)["sheets"]
+    for name in ("land", "excise", "mining"):
+        table = BUILDERS[name](sheets)
+        df = sheets[LOOKUP_SHEETS[name]]
+        key_columns = list(table.key_columns)
+        rate_columns = [c for c in df.columns if "Ставк" in c][:2]
+        result[name] = {}
+        for rows in sizes:
+            big = _enlarge_frame(df, rows, key_columns)
+            key = tuple(big.iloc[len(big) // 2][key_columns])
+            built = {}
+
+            def build():
+                built["table"] = RateTable.from_frame(big, key_columns, rate_columns)
+
+            result[name][str(rows)] = {
+                "pandas_mask": _timeit(lambda: _mask_lookup(big, key_columns, key), repeat=3),
+                "rate_table_build": _timeit(build, repeat=1),
+                "rate_table_lookup": _timeit(lambda: built["table"].lookup(*key), number=10000),
+            }
+    return result
+
+
+def enlarged_copy(path, factor, folder):
+    """Копия книги, где каждый лист повторён factor раз (для холодной загрузки)."""
+    target = os.path.join(folder, f"enlarged_x{factor}.xlsx")
+    sheets = pd.read_excel(path, sheet_name=None)
+    with pd.ExcelWriter(target, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            pd.concat([df] * factor, ignore_index=True).to_excel(writer, sheet_name=name, index=False)
+    return target
+
+
+def _flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def diff(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = _flatten(json.load(f))
+    with open(new_path, encoding="utf-8") as f:
+        new = _flatten(json.load(f))
+    for name in sorted(set(old) & set(new)):
+        if not name.endswith("_ms"):
+            continue
+        before, after = old[name], new[name]
+        ratio = after / before if before else float("inf")
+        marker = "  <-- медленнее" if ratio > 1.2 else ""
+        print(f"{name:90s} {before:12.4f} {after:12.4f}  x{ratio:6.2f}{marker}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workbook", default=snapshot.WORKBOOK_PATH)
+    parser.add_argument("--output")
+    parser.add_argument("--enlarge", type=int, default=0, help="множитель строк для копии книги")
+    parser.add_argument("--scaling", type=int, nargs="*", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--skip", nargs="*", default=[], choices=["load", "lookup", "rerun", "scaling", "memory", "startup"])
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--startup", action="store_true", help="только холодный старт страниц, таблицей")
+    args = parser.parse_args()
+
+    if args.diff:
+        diff(*args.diff)
+        return
+    if args.startup:
+        print_startup(bench_startup(SCRIPTS, args.workbook))
+        return
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        path = args.workbook
+        if args.enlarge > 1:
+            path = enlarged_copy(args.workbook, args.enlarge, folder)
+            report["meta"]["enlarge"] = args.enlarge
+        report["meta"]["workbook"] = os.path.basename(path)
+
+        if "load" not in args.skip:
+            report["load"] = bench_load(path)
+        if "lookup" not in args.skip:
+            report["lookup"] = bench_lookup(path)
+        if "rerun" not in args.skip:
+            report["rerun"] = bench_rerun(SCRIPTS)
+        if "scaling" not in args.skip and args.scaling:
+            report["scaling"] = bench_scaling(path, args.scaling)
+        if "memory" not in args.skip:
+            report["memory"] = bench_memory(path)
+        if "startup" not in args.skip:
+            report["startup"] = bench_startup(SCRIPTS, path)
+
+    data = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data)
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
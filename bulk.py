@@ -0,0 +1,172 @@
+"""Массовые расчёты по загруженным реестрам.
+
+Реестр объединяется с листом ставок одним векторизованным merge (земля)
+или двоичным поиском по интервалам цены (нефть), а налоги считаются
+арифметикой над колонками — без цикла по строкам.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from normalize import parse_numbers
+from tables import (
+    LAND_AREA,
+    LAND_CATEGORY,
+    LAND_CLASS,
+    LAND_COLUMNS,
+    OIL_PRICE,
+    OIL_VOLUME,
+)
+
+STATUS = "Статус"
+STATUS_OK = "OK"
+STATUS_NO_RATE = "ставка не найдена"
+STATUS_BAD_AREA = "некорректная площадь"
+STATUS_BAD_PRICE = "некорректная цена"
+STATUS_BAD_VOLUME = "некорректный объём"
+
+
+def read_register(file, name=None):
+    """Читает реестр из CSV (разделитель ; или ,) или XLSX. Все колонки — строки."""
+    name = (name or getattr(file, "name", "")).lower()
+    if name.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(file, dtype=str)
+    else:
+        if hasattr(file, "read"):
+            data = file.read()
+        else:
+            with open(file, "rb") as f:
+                data = f.read()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        header = data.split(b"\n", 1)[0]
+        sep = ";" if header.count(b";") > header.count(b",") else ","
+        df = pd.read_csv(io.BytesIO(data), sep=sep, dtype=str, encoding="utf-8-sig")
+    df.columns = [str(c).replace("\xa0", " ").strip() for c in df.columns]
+    return df
+
+
+def land_rate_frame(sheets):
+    """Ставки земельного налога с одной строкой на пару (категория, класс)."""
+    df = sheets["Земельный налог"][[LAND_CATEGORY, LAND_CLASS, "Ставки_2025", "Ставки_2026"]]
+    df = df.assign(**{
+        LAND_CATEGORY: df[LAND_CATEGORY].astype(str).str.strip(),
+        LAND_CLASS: df[LAND_CLASS].astype(str).str.strip(),
+    })
+    # Как и в калькуляторе, при повторе ключа берётся первая строка листа
+    return df.drop_duplicates([LAND_CATEGORY, LAND_CLASS], keep="first").reset_index(drop=True)
+
+
+def calculate_land(parcels, rates):
+    """Налог 2025/2026 и рост для каждого участка реестра.
+
+    Возвращает (результат по участкам, итоги по категориям).
+    """
+    missing = [col for col in LAND_COLUMNS if col not in parcels.columns]
+    if missing:
+        raise ValueError(f"В реестре нет колонок: {', '.join(missing)}")
+
+    parcels = parcels.reset_index(drop=True)
+    keys = pd.DataFrame({
+        LAND_CATEGORY: parcels[LAND_CATEGORY].astype(str).str.strip(),
+        LAND_CLASS: parcels[LAND_CLASS].astype(str).str.strip(),
+    })
+    merged = keys.merge(rates, how="left", on=[LAND_CATEGORY, LAND_CLASS], validate="many_to_one")
+
+    area = parse_numbers(parcels[LAND_AREA]).to_numpy()
+    rate_2025 = merged["Ставки_2025"].to_numpy(dtype="float64")
+    rate_2026 = merged["Ставки_2026"].to_numpy(dtype="float64")
+
+    tax_2025 = rate_2025 * area
+    tax_2026 = rate_2026 * area
+    growth_abs = tax_2026 - tax_2025
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_pct = np.where(tax_2025 > 0, growth_abs / tax_2025 * 100, 0.0)
+
+    status = np.where(
+        np.isnan(rate_2025) | np.isnan(rate_2026), STATUS_NO_RATE,
+        np.where(np.isnan(area) | (area < 0), STATUS_BAD_AREA, STATUS_OK),
+    )
+    ok = status == STATUS_OK
+    growth_pct = np.where(ok, growth_pct, np.nan)
+
+    result = parcels.assign(**{
+        LAND_CATEGORY: keys[LAND_CATEGORY],
+        LAND_CLASS: keys[LAND_CLASS],
+        LAND_AREA: area,
+        "Ставка_2025": rate_2025,
+        "Ставка_2026": rate_2026,
+        "Налог_2025": tax_2025,
+        "Налог_2026": tax_2026,
+        "Рост": growth_abs,
+        "Рост_%": growth_pct,
+        STATUS: status,
+    })
+
+    totals = (
+        result[ok]
+        .groupby(LAND_CATEGORY, sort=True)
+        .agg(**{
+            "Участков": (LAND_AREA, "size"),
+            LAND_AREA: (LAND_AREA, "sum"),
+            "Налог_2025": ("Налог_2025", "sum"),
+            "Налог_2026": ("Налог_2026", "sum"),
+        })
+        .reset_index()
+    )
+    totals["Рост"] = totals["Налог_2026"] - totals["Налог_2025"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["Рост_%"] = np.where(
+            totals["Налог_2025"] > 0, totals["Рост"] / totals["Налог_2025"] * 100, 0.0
+        )
+    return result, totals
+
+
+def calculate_oil_series(series, prices):
+    """Налог за добычу нефти по ряду цен и объёмов (например, помесячно).
+
+    prices — IntervalTable ставок по цене (tables.build_oil_prices): все цены
+    ряда разрешаются в диапазоны одним вызовом searchsorted. Рост в %
+    считается по ставкам, как в калькуляторе. Возвращает таблицу по строкам ряда.
+    """
+    missing = [col for col in (OIL_PRICE, OIL_VOLUME) if col not in series.columns]
+    if missing:
+        raise ValueError(f"В таблице нет колонок: {', '.join(missing)}")
+
+    price = parse_numbers(series[OIL_PRICE]).to_numpy()
+    volume = parse_numbers(series[OIL_VOLUME]).to_numpy()
+    bad_price = np.isnan(price) | (price < 0)
+    pos = np.where(bad_price, -1, prices.positions(price))
+    found = pos >= 0
+
+    # Позиция -1 попадает на добавленный в конец NaN / None
+    rate_2025 = np.append(prices.rate_2025, np.nan)[pos]
+    rate_2026 = np.append(prices.rate_2026, np.nan)[pos]
+    ranges = np.array(prices.labels + [None], dtype=object)[pos]
+
+    tax_2025 = rate_2025 * volume
+    tax_2026 = rate_2026 * volume
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_pct = np.where(rate_2025 != 0, (rate_2026 - rate_2025) / rate_2025 * 100, 0.0)
+
+    status = np.where(
+        bad_price, STATUS_BAD_PRICE,
+        np.where(~found, STATUS_NO_RATE,
+                 np.where(np.isnan(volume) | (volume < 0), STATUS_BAD_VOLUME, STATUS_OK)),
+    )
+    growth_pct = np.where(status == STATUS_OK, growth_pct, np.nan)
+
+    return series.reset_index(drop=True).assign(**{
+        OIL_PRICE: price,
+        OIL_VOLUME: volume,
+        "Ценовой диапазон": ranges,
+        "Ставка_2025": rate_2025,
+        "Ставка_2026": rate_2026,
+        "Налог_2025": tax_2025,
+        "Налог_2026": tax_2026,
+        "Рост": tax_2026 - tax_2025,
+        "Рост_%": growth_pct,
+        STATUS: status,
+    })
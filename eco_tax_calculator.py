@@ -1,56 +1,28 @@
 import streamlit as st
-import pandas as pd
-import re
-import time
 
-# Получаем параметры URL
-query_params = st.experimental_get_query_params()
+from metrics import span
+from result_cache import cached_calculate
+from tax_engine import ECO_KINDS, rate_table
+from ui import show_metrics_sidebar, show_quality_report
+from warmup import prime
 
-# Проверяем, это запрос для прогрева
-if "_warmup" in query_params:
-    # Минимальный ответ для прогрева
-    st.write("OK")
-    
-    # Небольшая пауза, чтобы убедиться, что приложение запущено
-    time.sleep(1)
+# Проверяем, это запрос для прогрева (параметр URL ?_warmup)
+if "_warmup" in st.query_params:
+    # Заполняем общие кеши: книга, индексы ставок, по одному расчёту на налог
+    st.json(prime())
     
     # Останавливаем дальнейшее выполнение
     st.stop()
 
-def parse_rate(value):
-    if pd.isna(value):
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = re.sub(r'[^\d\-\.]', '', value.replace(',', '.'))
-        if not cleaned or cleaned in ['.', '-', '.-', '-.']:
-            return None
-        try:
-            return float(cleaned)
-        except:
-            return None
-    return None
-
 st.title("Калькулятор экологических налогов (Беларусь, 2026)")
 
-# Загрузка
-df_air = pd.read_excel("Налоги_таблицы.xlsx", sheet_name="Эконалог_воздух")
-df_water = pd.read_excel("Налоги_таблицы.xlsx", sheet_name="Эконалог_сточные")
-df_waste = pd.read_excel("Налоги_таблицы.xlsx", sheet_name="Эконалог_захоронение")
-
-# Очистка колонок
-df_air.columns = df_air.columns.str.strip()
-df_water.columns = df_water.columns.str.strip()
-df_waste.columns = df_waste.columns.str.strip()
+# Загрузка (разбор ставок и индексы — один раз на версию книги, см. tables.py)
+with span("load", "eco"):
+    air = rate_table("eco_air")
+    water = rate_table("eco_water")
+    waste = rate_table("eco_waste")
 
-# Обработка отходов
-df_waste["Конкретный вид отхода"] = df_waste["Конкретный вид отхода"].fillna("")
-def format_waste_label(row):
-    cat = row["Категории отходов"]
-    spec = row["Конкретный вид отхода"]
-    return cat if spec == "" else f"{spec} ({cat})"
-df_waste["Отображаемое название"] = df_waste.apply(format_waste_label, axis=1)
+show_quality_report("Эконалог_воздух", "Эконалог_сточные", "Эконалог_захоронение")
 
 # Выбор типа
 tax_type = st.radio("Выберите вид экологического налога", 
@@ -60,43 +32,39 @@ st.markdown("---")
 
 if tax_type == "Выбросы в атмосферу":
     st.subheader("Выбросы")
-    selected = st.selectbox("Класс выбросов", df_air["Классы опасности выбросов"].unique())
-    row = df_air[df_air["Классы опасности выбросов"] == selected].iloc[0]
+    kind, key = "air", st.selectbox("Класс выбросов", air.options())
 
 elif tax_type == "Сброс сточных вод":
     st.subheader("Сброс сточных вод")
-    col = "Куда сбрасываются сточные воды"
-    selected = st.selectbox("Куда сбрасываются сточные воды", df_water[col].unique())
-    row = df_water[df_water[col] == selected].iloc[0]
+    kind, key = "water", st.selectbox("Куда сбрасываются сточные воды", water.options())
 
 else:
     st.subheader("Отходы")
-    action = st.selectbox("Способ обращения с отходами", df_waste["Способ обращения с отходами"].unique())
-    filtered = df_waste[df_waste["Способ обращения с отходами"] == action]
-    display = st.selectbox("Отходы", filtered["Отображаемое название"].unique())
-    row = filtered[filtered["Отображаемое название"] == display].iloc[0]
-
-# Парсинг ставок
-stavka_2025 = parse_rate(row["Ставка_2025"])
-stavka_2026 = parse_rate(row["Ставка_2026"])
-
-if stavka_2025 is None or stavka_2026 is None:
-    st.error("Не удалось прочитать ставки. Проверьте Excel.")
-    st.stop()
-
-unit = "тонн" if tax_type != "Сброс сточных вод" else "м³"
-quantity = st.number_input(f"Объём ({unit})", min_value=0.0, value=1.0, step=0.1)
-
-tax_2025 = stavka_2025 * quantity
-tax_2026 = stavka_2026 * quantity
-growth_abs = tax_2026 - tax_2025
-growth_pct = (growth_abs / tax_2025 * 100) if tax_2025 > 0 else 0
-
-st.subheader("Результаты")
-col1, col2, col3 = st.columns(3)
-with col1: st.metric("Налог 2025", f"{tax_2025:.2f} BYN")
-with col2: st.metric("Налог 2026", f"{tax_2026:.2f} BYN")
-with col3: st.metric("Рост", f"{growth_abs:.2f} BYN", delta=f"+{growth_pct:.1f}%")
-
-
-
+    action = st.selectbox("Способ обращения с отходами", waste.options())
+    display = st.selectbox("Отходы", waste.options(action))
+    kind, key = "waste", (action, display)
+
+# Ввод количества и результат — фрагмент: при изменении количества
+# перезапускается только он, а не весь скрипт (загрузка, списки вариантов)
+@st.fragment
+def show_result(kind, key):
+    unit = ECO_KINDS[kind][1]
+    quantity = st.number_input(f"Объём ({unit})", min_value=0.0, value=1.0, step=0.1)
+
+    try:
+        cached = cached_calculate(f"eco_{kind}", key, quantity)
+    except ValueError as e:
+        st.error(str(e))
+        return
+
+    with span("render", "eco"):
+        st.subheader("Результаты")
+        col1, col2, col3 = st.columns(3)
+        with col1: st.metric("Налог 2025", cached.tax_2025)
+        with col2: st.metric("Налог 2026", cached.tax_2026)
+        with col3: st.metric("Рост", cached.growth, delta=cached.delta)
+
+
+show_result(kind, key)
+
+show_metrics_sidebar()
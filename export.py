@@ -0,0 +1,140 @@
+"""Выгрузка отчётов в Excel и CSV без построения всего отчёта в памяти.
+
+Отчёт — набор листов {название: (заголовок, строки)}, где строки — генератор.
+XLSX пишется в режиме openpyxl write_only (строка за строкой, без модели
+ячеек), CSV отдаётся кусками. Готовый файл лежит во временном файле,
+который уходит на диск после 32 МБ, поэтому при записи в файл размер
+отчёта не определяет расход памяти. Кнопка Streamlit (ui.py) всё равно
+читает готовый файл целиком в bytes: там экономится только модель ячеек.
+
+    from export import rate_report, write_xlsx
+    with open("ставки.xlsx", "wb") as f:
+        f.write(write_xlsx(rate_report(quantity=10)).read())
+
+В Streamlit файл удобно собирать по нажатию кнопки (data=callable), тогда
+он строится в отдельном потоке и не задерживает перезапуск скрипта.
+"""
+
+import csv
+import io
+import math
+import tempfile
+
+from tax_engine import RATE_GROWTH_TAXES, TAX_TYPES, UNITS, compute, rate_table
+
+# Названия листов Excel — не длиннее 31 символа
+SHEET_TITLES = {
+    "land": "Земельный налог",
+    "transport": "Транспортный",
+    "excise": "Акцизы",
+    "eco_air": "Эконалог_воздух",
+    "eco_water": "Эконалог_сточные",
+    "eco_waste": "Эконалог_захоронение",
+    "oil": "Нефть",
+    "mining": "Добыча_ресурсов",
+}
+
+RATE_COLUMNS = [
+    "Единица", "Ставка_2025", "Ставка_2026", "Количество",
+    "Налог_2025", "Налог_2026", "Рост", "Рост_%",
+]
+
+SPOOL_SIZE = 32 * 1024 * 1024
+
+
+def rate_rows(tax, quantity=1.0, path=None):
+    """Строки сравнения ставок одного налога: ключ, ставки, налог за quantity, рост."""
+    table = rate_table(tax, path)
+    # Повторы ключа — по первой строке, как в калькуляторе
+    for key in dict.fromkeys(table.keys):
+        pos = table.position(*key)
+        unit = table.value("unit", pos) if "unit" in table.extra else UNITS[tax]
+        rate_2025, rate_2026 = table.rates_at(pos)
+        if math.isnan(rate_2025) or math.isnan(rate_2026):
+            # Нечитаемая ставка (см. отчёт о качестве) — строка без расчёта
+            yield [*key, unit, _cell(rate_2025), _cell(rate_2026), quantity, None, None, None, None]
+            continue
+        result = compute(rate_2025, rate_2026, quantity, unit, tax in RATE_GROWTH_TAXES)
+        yield [
+            *key, unit, rate_2025, rate_2026, quantity,
+            result.tax_2025, result.tax_2026, result.growth_abs, result.growth_pct,
+        ]
+
+
+def rate_report(quantity=1.0, taxes=TAX_TYPES, path=None):
+    """Отчёт по всем налогам: по листу на налог, строки строятся лениво."""
+    report = {}
+    for tax in taxes:
+        key_columns = list(rate_table(tax, path).key_columns)
+        report[SHEET_TITLES[tax]] = (key_columns + RATE_COLUMNS, rate_rows(tax, quantity, path))
+    return report
+
+
+def frame_sheet(df):
+    """Лист отчёта из DataFrame: строки отдаются по одной, без копии таблицы."""
+    return list(map(str, df.columns)), (
+        [_cell(value) for value in row] for row in df.itertuples(index=False, name=None)
+    )
+
+
+def _cell(value):
+    # NaN и pd.NA в Excel — пустая ячейка
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if type(value).__name__ == "NAType":
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def write_xlsx(report, target=None):
+    """Пишет отчёт в XLSX (write_only). Возвращает target или временный файл с начала."""
+    from openpyxl import Workbook
+
+    target = target if target is not None else tempfile.SpooledTemporaryFile(SPOOL_SIZE)
+    book = Workbook(write_only=True)
+    for title, (header, rows) in report.items():
+        sheet = book.create_sheet(title[:31])
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+    book.save(target)
+    if hasattr(target, "seek"):
+        target.seek(0)
+    return target
+
+
+def iter_csv(header, rows, batch=10_000):
+    """CSV кусками байт: ; и десятичная запятая, BOM в начале — чтобы Excel открывал без мастера."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", lineterminator="\r\n")
+    writer.writerow(header)
+    yield "\ufeff".encode("utf-8") + buffer.getvalue().encode("utf-8")
+    while True:
+        buffer.seek(0)
+        buffer.truncate()
+        count = 0
+        for row in rows:
+            writer.writerow([_csv_value(value) for value in row])
+            count += 1
+            if count == batch:
+                break
+        if not count:
+            return
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _csv_value(value):
+    if isinstance(value, float):
+        # float(): repr у numpy.float64 — «np.float64(1.5)»
+        return repr(float(value)).replace(".", ",")
+    return "" if value is None else value
+
+
+def write_csv(header, rows, target=None):
+    """CSV во временный файл (или target). Возвращает файл, перемотанный в начало."""
+    target = target if target is not None else tempfile.SpooledTemporaryFile(SPOOL_SIZE)
+    for chunk in iter_csv(header, rows):
+        target.write(chunk)
+    if hasattr(target, "seek"):
+        target.seek(0)
+    return target
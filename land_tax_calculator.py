@@ -0,0 +1,120 @@
+import streamlit as st
+
+from metrics import span
+from result_cache import cached_calculate
+from tables import LAND_COLUMNS
+from tax_engine import rate_table
+from ui import csv_download_button, frames_report, show_metrics_sidebar, show_quality_report, xlsx_download_button
+from warmup import prime
+from workbook import get_table
+
+# Проверяем, это запрос для прогрева (параметр URL ?_warmup)
+if "_warmup" in st.query_params:
+    # Заполняем общие кеши: книга, индексы ставок, по одному расчёту на налог
+    st.json(prime())
+    
+    # Останавливаем дальнейшее выполнение
+    st.stop()
+
+# Заголовок
+st.title("Калькулятор земельного налога (Беларусь, 2025–2026)")
+
+# Загрузка данных (общий кеш книги и индекс ставок на весь процесс)
+try:
+    with span("load", "land"):
+        table = rate_table("land")
+except FileNotFoundError:
+    st.error("Файл 'Налоги_таблицы.xlsx' не найден.")
+    st.stop()
+except Exception as e:
+    st.error(f"Ошибка при загрузке Excel: {e}")
+    st.stop()
+
+show_quality_report("Земельный налог")
+
+# Уникальные категории — можно сортировать
+categories = sorted(table.column_options(0))
+
+# Классы — сохраняем ПОРЯДОК из таблицы (без sort!)
+classes = table.column_options(1)
+
+# Ввод пользователя
+st.subheader("Выберите параметры сельхозугодий")
+
+col1, col2 = st.columns(2)
+with col1:
+    category = st.selectbox("Категория сельхозугодий", categories)
+with col2:
+    klass = st.selectbox("Кадастровая оценка земель (общий балл)", classes)
+
+# Ввод количества и результат — фрагмент: при изменении количества
+# перезапускается только он, а не весь скрипт (загрузка, списки вариантов)
+@st.fragment
+def show_result(category, klass):
+    area = st.number_input("Площадь, га", min_value=0.1, value=1.0, step=0.1)
+
+    # Расчёт (повторные входы — из общего кеша результатов)
+    cached = cached_calculate("land", (category, klass), area)
+
+    with span("render", "land"):
+        if cached is None:
+            st.warning("Не найдено ставок для выбранной комбинации.")
+        else:
+            result = cached.result
+            # Вывод результатов
+            st.subheader("Результаты расчёта")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Налог 2025", cached.tax_2025)
+            with col2:
+                st.metric("Налог 2026", cached.tax_2026)
+            with col3:
+                st.metric("Рост", cached.growth, delta=cached.delta)
+
+            # Детали
+            with st.expander("Детали"):
+                st.write(f"**Ставка 2025:** {result.rate_2025} BYN/га")
+                st.write(f"**Ставка 2026:** {result.rate_2026} BYN/га")
+                st.write(f"**Площадь:** {area} га")
+
+
+show_result(category, klass)
+
+# Массовый расчёт по реестру участков
+st.markdown("---")
+with st.expander("Массовый расчёт по реестру участков (CSV / XLSX)"):
+    st.write("Колонки реестра: " + ", ".join(f"**{col}**" for col in LAND_COLUMNS))
+    uploaded = st.file_uploader("Реестр участков", type=["csv", "xlsx"])
+
+    if uploaded is not None:
+        # pandas нужен только массовому расчёту — импортируем по требованию
+        from bulk import calculate_land, land_rate_frame, read_register
+
+        try:
+            parcels = read_register(uploaded)
+            result, totals = calculate_land(parcels, get_table("land_rate_frame", land_rate_frame, sheets=["Земельный налог"]))
+        except Exception as e:
+            st.error(f"Не удалось обработать реестр: {e}")
+            st.stop()
+
+        skipped = int((result["Статус"] != "OK").sum())
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Участков", f"{len(result):,}")
+        with col2:
+            st.metric("Налог 2025", f"{totals['Налог_2025'].sum():,.2f} BYN")
+        with col3:
+            st.metric("Налог 2026", f"{totals['Налог_2026'].sum():,.2f} BYN")
+        if skipped:
+            st.warning(f"Не рассчитано участков: {skipped} (см. колонку «Статус»).")
+
+        st.dataframe(totals, hide_index=True)
+        csv_download_button("Скачать расчёт по участкам (CSV)", result, "земельный_налог_реестр.csv")
+        xlsx_download_button(
+            "Скачать расчёт по участкам (XLSX)",
+            lambda: frames_report({"Итоги": totals, "Участки": result}),
+            "земельный_налог_реестр.xlsx",
+        )
+
+show_metrics_sidebar()
@@ -0,0 +1,313 @@
+"""Нагрузочный тест калькуляторов: N одновременных сессий на одном сервере.
+
+Скрипт запускается настоящим сервером Streamlit (streamlit run, без
+браузера) на свободном локальном порту, и N сессий подключаются к нему по
+websocket — как N вкладок браузера. Каждая сессия в цикле меняет случайный
+виджет страницы — выбирает вариант selectbox или radio (в том числе вид
+налога в экологическом калькуляторе), задаёт новое количество в
+number_input — и ждёт конца перезапуска. Виджеты внутри фрагментов
+(st.fragment) перезапускают только свой фрагмент, как в браузере.
+Внешние сервисы не нужны.
+
+    python loadtest.py                                # все калькуляторы, 8 сессий
+    python loadtest.py --sessions 32 --iterations 100 --output run.json
+    python loadtest.py my_land_calculator.py --sessions 16
+    python loadtest.py --diff old.json new.json       # сравнить два прогона
+
+Для каждого скрипта: пропускная способность (перезапусков в секунду на
+все сессии), задержка перезапуска p50/p95/p99, ошибки и рост памяти
+сервера (RSS после первого прогона каждой сессии и в конце, МБ; только
+Linux). Скрипты можно передать любые — например, копии калькуляторов на
+другом слое данных, чтобы сравнить их с текущими одним и тем же сценарием.
+Клиенты работают в одном потоке asyncio в этом процессе; на машине с одним
+ядром они делят его с сервером.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from bench import SCRIPTS, diff
+
+# Виджеты, которые меняет сессия (загрузка файлов и кнопки не трогаем)
+WIDGET_TYPES = ("selectbox", "radio", "number_input")
+
+SERVER_TIMEOUT = 60.0
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(script, port):
+    """streamlit run script на 127.0.0.1:port; возвращает процесс, когда сервер готов."""
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", script,
+            "--server.headless=true",
+            "--server.address=127.0.0.1",
+            f"--server.port={port}",
+            "--server.fileWatcherType=none",
+            "--browser.gatherUsageStats=false",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Сервер {script} завершился с кодом {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Сервер {script} не запустился за {SERVER_TIMEOUT:.0f} с")
+
+
+def _rss_mb(pid):
+    """RSS процесса, МБ; None, если /proc недоступен."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    pos = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[pos]
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def _widget(element, fragment_id):
+    """Описание виджета из элемента страницы: id, вид, варианты или границы."""
+    kind = element.WhichOneof("type")
+    proto = getattr(element, kind)
+    widget = {"id": proto.id, "type": kind, "fragment": fragment_id}
+    if kind == "number_input":
+        widget.update(
+            value=proto.value if proto.HasField("value") else proto.default,
+            step=proto.step or 1,
+            min=proto.min if proto.has_min else None,
+            max=proto.max if proto.has_max else None,
+            int=proto.data_type == proto.INT,
+        )
+    else:
+        widget["options"] = list(proto.options)
+    return widget
+
+
+def _change(widget, rng, states):
+    """Новое значение виджета в states, как от пользователя. False — менять нечего."""
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=widget["id"])
+    if widget["type"] == "number_input":
+        value = states[widget["id"]].double_value if widget["id"] in states else widget["value"]
+        value += widget["step"] * rng.randint(-20, 100)
+        if widget["min"] is not None:
+            value = max(value, widget["min"])
+        if widget["max"] is not None:
+            value = min(value, widget["max"])
+        state.double_value = round(value) if widget["int"] else round(value, 6)
+    else:
+        if len(widget["options"]) < 2:
+            return False
+        # Как и браузер, Streamlit получает подпись выбранного варианта
+        state.string_value = rng.choice(widget["options"])
+    states[widget["id"]] = state
+    return True
+
+
+class Session:
+    """Одна вкладка: websocket к серверу и состояние виджетов страницы."""
+
+    def __init__(self, url, seed):
+        self.url = url
+        self.rng = random.Random(seed)
+        self.states = {}  # id виджета -> WidgetState, который отправит «браузер»
+        self.widgets = {}  # id виджета -> описание (см. _widget)
+        self.ws = None
+
+    async def connect(self):
+        from websockets.asyncio.client import connect
+
+        self.ws = await connect(self.url, subprotocols=["streamlit"], max_size=None)
+        return await self.rerun()
+
+    async def close(self):
+        await self.ws.close()
+
+    async def step(self):
+        """Меняет один случайный виджет и перезапускает скрипт (или его фрагмент)."""
+        widgets = list(self.widgets.values())
+        self.rng.shuffle(widgets)
+        for widget in widgets:
+            if _change(widget, self.rng, self.states):
+                return await self.rerun(widget["fragment"])
+        return await self.rerun()
+
+    async def rerun(self, fragment_id=""):
+        """Отправляет состояние виджетов и ждёт конца прогона. Возвращает ошибки скрипта."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        message.rerun_script.fragment_id = fragment_id
+        await self.ws.send(message.SerializeToString())
+
+        widgets, errors = {}, []
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    errors.append(element.exception.message)
+                elif element_type in WIDGET_TYPES:
+                    widget = _widget(element, forward.delta.fragment_id)
+                    widgets[widget["id"]] = widget
+            elif kind == "script_finished":
+                if forward.script_finished == forward.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if forward.script_finished == forward.FINISHED_WITH_COMPILE_ERROR:
+                    errors.append("ошибка компиляции скрипта")
+                break
+
+        if fragment_id:
+            # Перезапуск фрагмента присылает только его элементы
+            widgets = {
+                **{key: w for key, w in self.widgets.items() if w["fragment"] != fragment_id},
+                **widgets,
+            }
+        self.widgets = widgets
+        # Состояние исчезнувших виджетов и вариантов, которых больше нет, браузер тоже забывает
+        self.states = {
+            key: state for key, state in self.states.items()
+            if key in widgets and (
+                widgets[key]["type"] == "number_input" or state.string_value in widgets[key]["options"]
+            )
+        }
+        return errors
+
+
+async def _load(url, sessions, iterations, seed, server_pid):
+    clients = [Session(url, seed + i) for i in range(sessions)]
+    errors = []
+    for found in await asyncio.gather(*(client.connect() for client in clients)):
+        errors.extend(found)
+    # Память сервера после первого прогона каждой сессии: книга загружена, кеши заполнены
+    rss_start = _rss_mb(server_pid)
+    samples = []
+
+    async def drive(client):
+        for _ in range(iterations):
+            started = time.perf_counter()
+            try:
+                found = await client.step()
+            except Exception as e:
+                errors.append(repr(e))
+                return
+            samples.append(time.perf_counter() - started)
+            errors.extend(found)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(drive(client) for client in clients))
+    elapsed = time.perf_counter() - started
+    rss_end = _rss_mb(server_pid)
+    for client in clients:
+        await client.close()
+
+    return {
+        "sessions": sessions,
+        "reruns": len(samples),
+        "errors": len(errors),
+        "first_errors": sorted(set(errors))[:5],
+        "seconds": round(elapsed, 3),
+        "reruns_per_second": round(len(samples) / elapsed, 2) if elapsed else None,
+        "p50_ms": _ms(_percentile(samples, 50)),
+        "p95_ms": _ms(_percentile(samples, 95)),
+        "p99_ms": _ms(_percentile(samples, 99)),
+        "rss_start_mb": None if rss_start is None else round(rss_start, 1),
+        "rss_growth_mb": None if rss_start is None or rss_end is None else round(rss_end - rss_start, 1),
+    }
+
+
+def run_script(script, sessions=8, iterations=50, seed=0):
+    """Сервер для script и N сессий по iterations перезапусков. Возвращает сводку."""
+    port = _free_port()
+    server = start_server(script, port)
+    try:
+        return asyncio.run(
+            _load(f"ws://127.0.0.1:{port}/_stcore/stream", sessions, iterations, seed, server.pid)
+        )
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scripts", nargs="*", help="скрипты Streamlit (по умолчанию — все калькуляторы)")
+    parser.add_argument("--sessions", type=int, default=8, help="одновременных сессий на скрипт")
+    parser.add_argument("--iterations", type=int, default=50, help="перезапусков на сессию")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.diff:
+        diff(*args.diff)
+        return
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    scripts = args.scripts or [os.path.join(root, script) for script in SCRIPTS]
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sessions": args.sessions,
+            "iterations": args.iterations,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+    }
+    for script in scripts:
+        print(f"{os.path.basename(script)}: {args.sessions} сессий…", file=sys.stderr)
+        report[os.path.basename(script)] = run_script(script, args.sessions, args.iterations, args.seed)
+
+    data = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(data)
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
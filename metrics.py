@@ -0,0 +1,162 @@
+"""Замеры времени горячих участков калькуляторов.
+
+Включаются переменной окружения TAX_METRICS=1. Участки кода оборачиваются в
+span(этап, цель); длительности собираются в гистограммы уровня процесса:
+
+    with span("lookup", "land"):
+        rates = table.lookup(category, klass)
+
+Этапы: load (книга и индексы), clean (нормализация листа), index (сборка
+индекса ставок), lookup, compute, render (вывод результатов в Streamlit).
+
+Выгрузка: prometheus_text() (маршрут /metrics в api.py), as_dict() /
+dump_json() — файл из TAX_METRICS_FILE пишется при выходе из процесса.
+Панель в боковой колонке калькуляторов — ui.show_metrics_sidebar().
+
+Когда замеры выключены, span() возвращает один общий пустой объект:
+ни часов, ни блокировок, ни выделения памяти.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("TAX_METRICS", "").strip().lower() not in ("", "0", "false", "no")
+METRICS_FILE = os.environ.get("TAX_METRICS_FILE", "")
+
+# Верхние границы корзин гистограммы, секунды
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+_lock = threading.Lock()
+_histograms = {}  # (этап, цель) -> _Histogram
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += seconds
+        self.count += 1
+
+
+def observe(stage, target, seconds):
+    key = (stage, target)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+        hist.observe(seconds)
+
+
+class _Span:
+    __slots__ = ("stage", "target", "started")
+
+    def __init__(self, stage, target):
+        self.stage = stage
+        self.target = target
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.stage, self.target, time.perf_counter() - self.started)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage, target=""):
+    """Контекстный менеджер замера; при выключенных замерах ничего не делает."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(stage, target)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+def as_dict():
+    """Гистограммы в виде JSON-совместимого словаря (время — в мс)."""
+    with _lock:
+        items = sorted(_histograms.items())
+        rows = [(key, list(h.counts), h.total, h.count) for key, h in items]
+    result = []
+    for (stage, target), counts, total, count in rows:
+        result.append({
+            "stage": stage,
+            "target": target,
+            "count": count,
+            "sum_ms": round(total * 1000, 4),
+            "mean_ms": round(total * 1000 / count, 4) if count else 0.0,
+            "buckets_ms": {
+                **{f"{bound * 1000:g}": n for bound, n in zip(BUCKETS, counts)},
+                "+Inf": counts[-1],
+            },
+        })
+    return {"enabled": ENABLED, "spans": result}
+
+
+def prometheus_text():
+    """Гистограммы в текстовом формате Prometheus (накопительные корзины)."""
+    name = "tax_calculator_span_seconds"
+    lines = [
+        f"# HELP {name} Длительность участков расчёта налогов.",
+        f"# TYPE {name} histogram",
+    ]
+    with _lock:
+        rows = [(key, list(h.counts), h.total, h.count) for key, h in sorted(_histograms.items())]
+    for (stage, target), counts, total, count in rows:
+        labels = f'stage="{stage}",target="{_escape(target)}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS, counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+        lines.append(f"{name}_sum{{{labels}}} {total:.9f}")
+        lines.append(f"{name}_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def dump_json(path=None):
+    """Пишет as_dict() в файл (по умолчанию TAX_METRICS_FILE)."""
+    path = path or METRICS_FILE
+    if not path:
+        return None
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(as_dict(), f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+if ENABLED and METRICS_FILE:
+    atexit.register(dump_json)
@@ -0,0 +1,71 @@
+"""Нормализация числовых колонок книги.
+
+Один векторный проход pandas на колонку вместо регулярного выражения на
+каждую ячейку: неразрывные пробелы, запятая как десятичный разделитель,
+единицы измерения и прочий мусор. Выполняется один раз на версию книги
+(при сборке снимка, см. snapshot.py). Ячейки, которые не удалось прочитать,
+не выбрасываются молча, а попадают в отчёт о качестве данных.
+"""
+
+import pandas as pd
+
+# Колонки со ставками и суммами: по этим подстрокам в названии
+NUMERIC_COLUMN_MARKERS = ("Ставк", "Налог_20", "Рост")
+
+# Всё, кроме цифр, точки и минуса (после замены запятой на точку)
+_JUNK = r"[^\d\-.]"
+
+
+def is_numeric_column(name):
+    return any(marker in name for marker in NUMERIC_COLUMN_MARKERS)
+
+
+def parse_numbers(values):
+    """Series -> float64 Series; нечитаемые значения становятся NaN."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype("float64")
+
+    numbers = pd.to_numeric(values, errors="coerce")
+    todo = numbers.isna() & values.notna()
+    if todo.any():
+        text = (
+            values[todo]
+            .astype(str)
+            .str.replace(",", ".", regex=False)
+            .str.replace(_JUNK, "", regex=True)
+        )
+        numbers = numbers.astype("float64")
+        numbers[todo] = pd.to_numeric(text, errors="coerce")
+    return numbers.astype("float64")
+
+
+def unparsed_mask(values, numbers):
+    """Непустые ячейки, из которых не получилось число."""
+    blank = values.isna() | values.astype(str).str.strip().eq("")
+    return numbers.isna() & ~blank
+
+
+def normalize_sheet(sheet_name, df, excel_rows=None):
+    """Приводит числовые колонки листа к float64.
+
+    Возвращает (лист, отчёт): отчёт — список нечитаемых ячеек с номером
+    строки Excel (excel_rows — номера строк по порядку строк df).
+    """
+    if excel_rows is None:
+        excel_rows = [i + 2 for i in range(len(df))]  # строка 1 — заголовок
+    issues = []
+    for col in df.columns:
+        if not is_numeric_column(col):
+            continue
+        values = df[col]
+        numbers = parse_numbers(values)
+        bad = unparsed_mask(values, numbers).to_numpy()
+        for pos in bad.nonzero()[0]:
+            issues.append({
+                "Лист": sheet_name,
+                "Колонка": col,
+                "Строка": int(excel_rows[pos]),
+                "Значение": str(values.iloc[pos]),
+            })
+        df[col] = numbers
+    return df, issues
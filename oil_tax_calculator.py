@@ -1,100 +1,127 @@
 import streamlit as st
-import pandas as pd
-import time
 
-# Получаем параметры URL
-query_params = st.experimental_get_query_params()
-
-# Проверяем, это запрос для прогрева
-if "_warmup" in query_params:
-    # Минимальный ответ для прогрева
-    st.write("OK")
-    
-    # Небольшая пауза, чтобы убедиться, что приложение запущено
-    time.sleep(1)
+from metrics import span
+from result_cache import cached_calculate
+from tables import OIL_COLUMNS
+from tax_engine import oil_price_range, rate_table
+from ui import csv_download_button, frames_report, show_metrics_sidebar, show_quality_report, xlsx_download_button
+from warmup import prime
+
+# Проверяем, это запрос для прогрева (параметр URL ?_warmup)
+if "_warmup" in st.query_params:
+    # Заполняем общие кеши: книга, индексы ставок, по одному расчёту на налог
+    st.json(prime())
     
     # Останавливаем дальнейшее выполнение
     st.stop()
 
 st.title("Калькулятор налога за добычу нефти (Беларусь, 2026)")
 
-# Загрузка данных
+# Загрузка данных (колонки определяются по ключевым словам в tables.build_oil)
 try:
-    df = pd.read_excel("Налоги_таблицы.xlsx", sheet_name="Ставки на нефть")
+    with span("load", "oil"):
+        table = rate_table("oil")
+except ValueError as e:
+    st.error(f"{e}. Проверьте лист 'Ставки на нефть'.")
+    st.stop()
 except Exception as e:
     st.error(f"Не удалось загрузить файл: {e}")
     st.stop()
 
-# Очистка названий колонок от пробелов и лишних символов
-df.columns = df.columns.str.strip()
-
-# Автоматическое определение колонок по ключевым словам
-price_col = None
-rate25_col = None
-rate26_col = None
-
-for col in df.columns:
-    if "Средняя цена" in col and "$" in col:
-        price_col = col
-    elif "Ставка_2025" in col and "BYN" in col:
-        rate25_col = col
-    elif "Ставка_2026" in col and "BYN" in col:
-        rate26_col = col
-
-if not all([price_col, rate25_col, rate26_col]):
-    st.error("Не найдены необходимые колонки. Проверьте лист 'Ставки на нефть'.")
-    st.stop()
-
-# Преобразуем ставки в числа (на случай, если Excel сохранил как текст)
-df[rate25_col] = pd.to_numeric(df[rate25_col], errors='coerce')
-df[rate26_col] = pd.to_numeric(df[rate26_col], errors='coerce')
-
-# Удаляем строки с ошибками
-df = df.dropna(subset=[rate25_col, rate26_col])
-
-# Выбор диапазона цены
-price_ranges = df[price_col].astype(str).tolist()
-selected_index = st.selectbox(
-    "Выберите ценовой диапазон (средняя цена за 1000 кг нефти, $)",
-    range(len(price_ranges)),
-    format_func=lambda i: price_ranges[i]
-)
-
-row = df.iloc[selected_index]
-stavka_2025 = float(row[rate25_col])
-stavka_2026 = float(row[rate26_col])
-price_range_label = row[price_col]
-
-# Расчёт роста (даже если он есть в Excel — пересчитываем для надёжности)
-growth_pct = ((stavka_2026 - stavka_2025) / stavka_2025 * 100) if stavka_2025 != 0 else 0
-
-# Ввод объёма нефти (в тоннах или 1000 кг)
-quantity = st.number_input(
-    "Объём нефти (в тоннах = 1000 кг)",
-    min_value=0.0,
-    value=1.0,
-    step=0.1,
-    help="Акциз рассчитывается за каждую тонну (1000 кг) нефти"
-)
-
-# Расчёт налога
-tax_2025 = stavka_2025 * quantity
-tax_2026 = stavka_2026 * quantity
-growth_abs = tax_2026 - tax_2025
-
-# Вывод результатов
-st.subheader("Результаты расчёта")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Ставка 2025", f"{tax_2025:.2f} BYN")
-with col2:
-    st.metric("Ставка 2026", f"{tax_2026:.2f} BYN")
-with col3:
-    st.metric("Рост", f"{growth_abs:.2f} BYN", delta=f"+{growth_pct:.1f}%")
-
-with st.expander("Детали"):
-    st.write(f"**Ценовой диапазон:** {price_range_label}")
-    st.write(f"**Ставка 2025:** {stavka_2025} BYN/тонну")
-    st.write(f"**Ставка 2026:** {stavka_2026} BYN/тонну")
-
-    st.write(f"**Объём:** {quantity} тонн")
+show_quality_report("Ставки на нефть")
+
+# Выбор диапазона цены: из списка или по самой цене
+mode = st.radio("Как задать цену", ["Ценовой диапазон", "Средняя цена, $"], horizontal=True)
+
+if mode == "Ценовой диапазон":
+    price_range_label = st.selectbox(
+        "Выберите ценовой диапазон (средняя цена за 1000 кг нефти, $)",
+        table.options()
+    )
+else:
+    price = st.number_input("Средняя цена за 1000 кг нефти, $", min_value=0.0, value=700.0, step=10.0)
+    try:
+        price_range_label = oil_price_range(price)
+    except ValueError as e:
+        # Границы диапазонов разбираются из текста листа (tables.parse_price_range)
+        st.error(f"{e}. Проверьте лист 'Ставки на нефть'.")
+        st.stop()
+    if price_range_label is None:
+        st.warning("Цена не попадает ни в один ценовой диапазон.")
+        st.stop()
+    st.caption(f"Ценовой диапазон: **{price_range_label.strip()}**")
+
+# Ввод количества и результат — фрагмент: при изменении количества
+# перезапускается только он, а не весь скрипт (загрузка, списки вариантов)
+@st.fragment
+def show_result(price_range_label):
+    # Ввод объёма нефти (в тоннах или 1000 кг)
+    quantity = st.number_input(
+        "Объём нефти (в тоннах = 1000 кг)",
+        min_value=0.0,
+        value=1.0,
+        step=0.1,
+        help="Акциз рассчитывается за каждую тонну (1000 кг) нефти"
+    )
+
+    # Расчёт налога (рост пересчитывается по ставкам, даже если он есть в Excel)
+    cached = cached_calculate("oil", price_range_label, quantity)
+    result = cached.result
+
+    # Вывод результатов
+    with span("render", "oil"):
+        st.subheader("Результаты расчёта")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Ставка 2025", cached.tax_2025)
+        with col2:
+            st.metric("Ставка 2026", cached.tax_2026)
+        with col3:
+            st.metric("Рост", cached.growth, delta=cached.delta)
+
+        with st.expander("Детали"):
+            st.write(f"**Ценовой диапазон:** {price_range_label}")
+            st.write(f"**Ставка 2025:** {result.rate_2025} BYN/тонну")
+            st.write(f"**Ставка 2026:** {result.rate_2026} BYN/тонну")
+
+            st.write(f"**Объём:** {quantity} тонн")
+
+
+show_result(price_range_label)
+
+# Расчёт по ряду цен (помесячный план, сценарии)
+st.markdown("---")
+with st.expander("Расчёт по ряду цен и объёмов (CSV / XLSX)"):
+    st.write("Колонки таблицы: " + ", ".join(f"**{col}**" for col in OIL_COLUMNS))
+    uploaded = st.file_uploader("Цены и объёмы", type=["csv", "xlsx"])
+
+    if uploaded is not None:
+        # pandas нужен только расчёту по ряду — импортируем по требованию
+        from bulk import calculate_oil_series, read_register
+
+        try:
+            series = calculate_oil_series(read_register(uploaded), rate_table("oil_prices"))
+        except Exception as e:
+            st.error(f"Не удалось обработать таблицу: {e}")
+            st.stop()
+
+        ok = series["Статус"] == "OK"
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Строк", f"{len(series):,}")
+        with col2:
+            st.metric("Налог 2025", f"{series.loc[ok, 'Налог_2025'].sum():,.2f} BYN")
+        with col3:
+            st.metric("Налог 2026", f"{series.loc[ok, 'Налог_2026'].sum():,.2f} BYN")
+        if not ok.all():
+            st.warning(f"Не рассчитано строк: {int((~ok).sum())} (см. колонку «Статус»).")
+
+        st.dataframe(series, hide_index=True)
+        csv_download_button("Скачать расчёт (CSV)", series, "налог_нефть_ряд_цен.csv")
+        xlsx_download_button(
+            "Скачать расчёт (XLSX)",
+            lambda: frames_report({"Ряд цен": series}),
+            "налог_нефть_ряд_цен.xlsx",
+        )
+
+show_metrics_sidebar()
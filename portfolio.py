@@ -0,0 +1,137 @@
+"""Сводный расчёт всех налогов предприятия одним проходом.
+
+Ставки всех калькуляторов сводятся в одну длинную таблицу
+(налог, ключ, ключ 2, ставки, единица) — один раз на версию книги.
+Список позиций предприятия объединяется с ней одним merge, налоги
+считаются арифметикой над колонками, итоги — одним groupby.
+
+Позиция: налог (код из tax_engine.TAX_TYPES), ключ строки ставок и
+количество. «Ключ 2» нужен только земле (класс) и отходам (название отхода).
+"""
+
+import numpy as np
+import pandas as pd
+
+from bulk import STATUS, STATUS_NO_RATE, STATUS_OK
+from normalize import parse_numbers
+from tables import BUILDERS
+from tax_engine import RATE_GROWTH_TAXES, TAX_TYPES, UNITS
+
+TAX = "Налог"
+KEY = "Ключ"
+KEY_2 = "Ключ 2"
+QUANTITY = "Количество"
+ITEM_COLUMNS = [TAX, KEY, KEY_2, QUANTITY]
+KEY_COLUMNS = [TAX, KEY, KEY_2]
+UNIT = "Единица"
+
+STATUS_UNKNOWN_TAX = "неизвестный налог"
+STATUS_BAD_QUANTITY = "некорректное количество"
+
+
+def portfolio_rate_frame(sheets):
+    """Ставки всех налогов в длинном формате, по одной строке на ключ."""
+    frames = []
+    for tax in TAX_TYPES:
+        table = BUILDERS[tax](sheets)
+        keys = list(zip(*table.keys)) or [()] * len(table.key_columns)
+        if "unit" in table.extra:
+            unit = table.extra["unit"]
+        else:
+            unit = [UNITS[tax]] * len(table)
+        frames.append(pd.DataFrame({
+            TAX: tax,
+            KEY: keys[0],
+            KEY_2: keys[1] if len(keys) > 1 else "",
+            "Ставка_2025": table.rate_2025,
+            "Ставка_2026": table.rate_2026,
+            UNIT: unit,
+        }))
+    df = pd.concat(frames, ignore_index=True)
+    df[KEY] = df[KEY].astype(str).str.strip()
+    df[KEY_2] = df[KEY_2].astype(str).str.strip()
+    # Как и в калькуляторах, при повторе ключа берётся первая строка листа
+    return df.drop_duplicates(KEY_COLUMNS, keep="first").reset_index(drop=True)
+
+
+def calculate_portfolio(items, rates):
+    """Налог 2025/2026 по каждой позиции и итоги по налогам.
+
+    items — DataFrame с колонками ITEM_COLUMNS (KEY_2 можно не указывать),
+    rates — portfolio_rate_frame(). Возвращает (позиции, итоги): в итогах
+    по строке на налог и последняя строка «Итого».
+    """
+    missing = [col for col in (TAX, KEY, QUANTITY) if col not in items.columns]
+    if missing:
+        raise ValueError(f"В списке позиций нет колонок: {', '.join(missing)}")
+
+    items = items.reset_index(drop=True)
+    keys = pd.DataFrame({
+        TAX: items[TAX].astype(str).str.strip(),
+        KEY: items[KEY].astype(str).str.strip(),
+        KEY_2: (items[KEY_2].fillna("").astype(str).str.strip() if KEY_2 in items.columns else ""),
+    })
+    merged = keys.merge(rates, how="left", on=KEY_COLUMNS, validate="many_to_one")
+
+    quantity = parse_numbers(items[QUANTITY]).to_numpy()
+    rate_2025 = merged["Ставка_2025"].to_numpy(dtype="float64")
+    rate_2026 = merged["Ставка_2026"].to_numpy(dtype="float64")
+
+    tax_2025 = rate_2025 * quantity
+    tax_2026 = rate_2026 * quantity
+    growth_abs = tax_2026 - tax_2025
+    by_rates = keys[TAX].isin(RATE_GROWTH_TAXES).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth_pct = np.where(
+            by_rates,
+            np.where(rate_2025 != 0, (rate_2026 - rate_2025) / rate_2025 * 100, 0.0),
+            np.where(tax_2025 > 0, growth_abs / tax_2025 * 100, 0.0),
+        )
+
+    status = np.where(
+        ~keys[TAX].isin(TAX_TYPES).to_numpy(), STATUS_UNKNOWN_TAX,
+        np.where(np.isnan(rate_2025) | np.isnan(rate_2026), STATUS_NO_RATE,
+                 np.where(np.isnan(quantity) | (quantity < 0), STATUS_BAD_QUANTITY, STATUS_OK)),
+    )
+    ok = status == STATUS_OK
+    growth_pct = np.where(ok, growth_pct, np.nan)
+
+    result = items.assign(**{
+        TAX: keys[TAX],
+        KEY: keys[KEY],
+        KEY_2: keys[KEY_2],
+        QUANTITY: quantity,
+        UNIT: merged[UNIT],
+        "Ставка_2025": rate_2025,
+        "Ставка_2026": rate_2026,
+        "Налог_2025": tax_2025,
+        "Налог_2026": tax_2026,
+        "Рост": growth_abs,
+        "Рост_%": growth_pct,
+        STATUS: status,
+    })
+
+    totals = (
+        result[ok]
+        .groupby(TAX, sort=False)
+        .agg(**{
+            "Позиций": (QUANTITY, "size"),
+            "Налог_2025": ("Налог_2025", "sum"),
+            "Налог_2026": ("Налог_2026", "sum"),
+        })
+    )
+    # Налоги в порядке TAX_TYPES, а не в порядке первого появления в списке
+    totals = totals.reindex([tax for tax in TAX_TYPES if tax in totals.index]).reset_index()
+    grand = pd.DataFrame({
+        TAX: ["Итого"],
+        "Позиций": [int(totals["Позиций"].sum())],
+        "Налог_2025": [totals["Налог_2025"].sum()],
+        "Налог_2026": [totals["Налог_2026"].sum()],
+    })
+    totals = pd.concat([totals, grand], ignore_index=True)
+    totals["Рост"] = totals["Налог_2026"] - totals["Налог_2025"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["Рост_%"] = np.where(
+            totals["Налог_2025"] > 0, totals["Рост"] / totals["Налог_2025"] * 100, 0.0
+        )
+    return result, totals
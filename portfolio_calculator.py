@@ -0,0 +1,94 @@
+import streamlit as st
+
+from bulk import read_register
+from metrics import span
+from portfolio import ITEM_COLUMNS, KEY_COLUMNS, QUANTITY, TAX, calculate_portfolio, portfolio_rate_frame
+from tax_engine import TAX_TYPES
+from ui import TAX_LABELS, csv_download_button, frames_report, show_metrics_sidebar, show_quality_report, xlsx_download_button
+from warmup import prime
+from workbook import get_table
+
+# Проверяем, это запрос для прогрева (параметр URL ?_warmup)
+if "_warmup" in st.query_params:
+    # Заполняем общие кеши: книга, индексы ставок, по одному расчёту на налог
+    st.json(prime())
+
+    # Останавливаем дальнейшее выполнение
+    st.stop()
+
+st.title("Сводный расчёт налогов предприятия (Беларусь, 2025–2026)")
+
+# Ставки всех налогов одной таблицей — один раз на версию книги
+try:
+    with span("load", "portfolio"):
+        rates = get_table("portfolio_rates", portfolio_rate_frame)
+except Exception as e:
+    st.error(f"Ошибка при загрузке Excel: {e}")
+    st.stop()
+
+show_quality_report()
+
+st.write(
+    "Позиции: **Налог** (" + ", ".join(f"`{tax}`" for tax in TAX_TYPES) + "), "
+    "**Ключ** — строка ставок, **Ключ 2** — класс земель или название отхода, **Количество**."
+)
+
+uploaded = st.file_uploader("Список позиций (CSV / XLSX)", type=["csv", "xlsx"])
+if uploaded is not None:
+    try:
+        items = read_register(uploaded)
+    except Exception as e:
+        st.error(f"Не удалось прочитать файл: {e}")
+        st.stop()
+else:
+    # Пример: по первой строке ставок каждого налога
+    sample = rates.groupby(TAX, sort=False).head(1)[KEY_COLUMNS].assign(**{QUANTITY: 1.0})
+    items = st.data_editor(
+        sample.reset_index(drop=True),
+        num_rows="dynamic",
+        hide_index=True,
+        column_config={
+            TAX: st.column_config.SelectboxColumn(TAX, options=list(TAX_TYPES), required=True),
+            QUANTITY: st.column_config.NumberColumn(QUANTITY, min_value=0.0),
+        },
+        column_order=ITEM_COLUMNS,
+    )
+
+try:
+    with span("compute", "portfolio"):
+        result, totals = calculate_portfolio(items, rates)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+
+with span("render", "portfolio"):
+    grand = totals.iloc[-1]
+    st.subheader("Итого по предприятию")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Налог 2025", f"{grand['Налог_2025']:,.2f} BYN")
+    with col2:
+        st.metric("Налог 2026", f"{grand['Налог_2026']:,.2f} BYN")
+    with col3:
+        st.metric("Рост", f"{grand['Рост']:,.2f} BYN", delta=f"+{grand['Рост_%']:.1f}%")
+
+    skipped = int((result["Статус"] != "OK").sum())
+    if skipped:
+        st.warning(f"Не рассчитано позиций: {skipped} (см. колонку «Статус»).")
+
+    st.subheader("По налогам")
+    st.dataframe(
+        totals.assign(**{TAX: totals[TAX].map(lambda tax: TAX_LABELS.get(tax, tax))}),
+        hide_index=True,
+    )
+
+    with st.expander("Расчёт по позициям"):
+        st.dataframe(result, hide_index=True)
+    csv_download_button("Скачать расчёт по позициям (CSV)", result, "налоги_предприятия.csv")
+    xlsx_download_button(
+        "Скачать расчёт по позициям (XLSX)",
+        lambda: frames_report({"Итоги": totals, "Позиции": result}),
+        "налоги_предприятия.xlsx",
+    )
+
+show_metrics_sidebar()
@@ -0,0 +1,142 @@
+"""Индексированная таблица ставок.
+
+RateTable строится один раз на версию книги и заменяет фильтрацию
+DataFrame булевыми масками на каждом перезапуске скрипта: ставки лежат
+в массивах float64, а ключевые колонки — в хеш-индексе, поэтому поиск
+ставки занимает O(1) и возвращает обычные float без материализации строк
+pandas. Там же хранятся упорядоченные списки вариантов для selectbox.
+
+Таблицы живут в кеше процесса всё время работы, поэтому хранятся
+компактно: строки ключей и единиц интернируются (одна копия «га» или
+«за литр» на процесс), повторяющиеся ключи — один и тот же кортеж,
+атрибуты — в __slots__ без словаря экземпляра.
+
+IntervalTable — то же для ставок, заданных числовыми интервалами.
+"""
+
+import sys
+from bisect import bisect_left
+
+import numpy as np
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class RateTable:
+    __slots__ = ("key_columns", "keys", "rate_2025", "rate_2026", "extra", "_index", "_options", "_columns")
+
+    def __init__(self, key_columns, keys, rate_2025, rate_2026, extra=None):
+        self.key_columns = tuple(_intern(col) for col in key_columns)
+        unique = {}
+        self.keys = [
+            unique.setdefault(key, key) for key in (tuple(_intern(v) for v in key) for key in keys)
+        ]
+        self.rate_2025 = np.asarray(rate_2025, dtype="float64")
+        self.rate_2026 = np.asarray(rate_2026, dtype="float64")
+        self.extra = {name: [_intern(v) for v in values] for name, values in (extra or {}).items()}
+
+        # Ключ -> позиция первой строки (как .iloc[0] после фильтра)
+        self._index = {}
+        # Префикс ключа -> варианты следующего уровня в порядке таблицы
+        options = {}
+        # Уровень ключа -> все значения колонки в порядке таблицы
+        columns = [dict() for _ in self.key_columns]
+        for pos, key in enumerate(self.keys):
+            self._index.setdefault(key, pos)
+            for level, value in enumerate(key):
+                options.setdefault(key[:level], {}).setdefault(value, None)
+                columns[level].setdefault(value, None)
+        self._options = {prefix: tuple(values) for prefix, values in options.items()}
+        self._columns = [tuple(values) for values in columns]
+
+    @classmethod
+    def from_frame(cls, df, key_columns, rate_columns, extra_columns=None):
+        """extra_columns: {имя: колонка} — дополнительные значения строки (единицы и т. п.)."""
+        keys = zip(*(df[col].tolist() for col in key_columns))
+        extra = {name: df[col].tolist() for name, col in (extra_columns or {}).items()}
+        rate_2025, rate_2026 = rate_columns
+        return cls(key_columns, keys, df[rate_2025].to_numpy(), df[rate_2026].to_numpy(), extra)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def position(self, *key):
+        return self._index.get(key)
+
+    def rates_at(self, pos):
+        return float(self.rate_2025[pos]), float(self.rate_2026[pos])
+
+    def lookup(self, *key):
+        """(ставка 2025, ставка 2026) или None, если ключа нет в таблице."""
+        pos = self._index.get(key)
+        if pos is None:
+            return None
+        return self.rates_at(pos)
+
+    def value(self, name, pos):
+        return self.extra[name][pos]
+
+    def options(self, *prefix):
+        """Варианты следующей ключевой колонки при выбранных предыдущих."""
+        return self._options.get(prefix, ())
+
+    def column_options(self, level):
+        """Все значения ключевой колонки в порядке таблицы, без повторов."""
+        return self._columns[level]
+
+
+class IntervalTable:
+    """Ставки по числовым интервалам (например, цене нефти).
+
+    Интервалы сортируются по верхней границе и ищутся двоичным поиском:
+    position() — для одного значения, positions() — один вызов
+    np.searchsorted на целый массив. Верхняя граница входит в интервал
+    («До 578,4» включает 578,4), нижняя — нет.
+    """
+
+    __slots__ = ("labels", "lower", "upper", "rate_2025", "rate_2026", "_upper")
+
+    def __init__(self, labels, lower, upper, rate_2025, rate_2026):
+        lower = np.asarray(lower, dtype="float64")
+        upper = np.asarray(upper, dtype="float64")
+        order = np.argsort(upper, kind="stable")
+        self.labels = [_intern(labels[i]) for i in order]
+        self.lower = lower[order]
+        self.upper = upper[order]
+        self.rate_2025 = np.asarray(rate_2025, dtype="float64")[order]
+        self.rate_2026 = np.asarray(rate_2026, dtype="float64")[order]
+        if np.any(self.lower > self.upper) or np.any(self.lower[1:] < self.upper[:-1]):
+            raise ValueError("Интервалы пересекаются или заданы в обратном порядке")
+        self._upper = self.upper.tolist()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def position(self, value):
+        """Позиция интервала, содержащего value, или None."""
+        if value != value:  # NaN
+            return None
+        pos = bisect_left(self._upper, value)
+        if pos == len(self._upper) or value <= self.lower[pos]:
+            return None
+        return pos
+
+    def positions(self, values):
+        """Позиции интервалов для массива значений; -1 — значение вне интервалов."""
+        values = np.asarray(values, dtype="float64")
+        pos = np.searchsorted(self.upper, values, side="left")
+        inside = pos < len(self.upper)
+        clipped = np.minimum(pos, len(self.upper) - 1)
+        inside &= values > self.lower[clipped]
+        return np.where(inside, pos, -1)
+
+    def rates_at(self, pos):
+        return float(self.rate_2025[pos]), float(self.rate_2026[pos])
+
+    def lookup(self, value):
+        pos = self.position(value)
+        if pos is None:
+            return None
+        return self.rates_at(pos)
@@ -0,0 +1,163 @@
+"""Общий для всех сессий кеш результатов расчёта.
+
+Большая часть запросов повторяет одни и те же входы: количество 1,0 по
+умолчанию, популярные товары и категории земель. Результат расчёта вместе
+с готовыми строками для st.metric хранится в кеше уровня процесса с ключом
+(налог, ключ, количество, типы значений, SHA-256 книги): после замены книги
+ключи меняются сами, а записи старой версии вытесняются.
+
+Кеш ограничен: не больше TAX_RESULT_CACHE_SIZE записей (по умолчанию 4096,
+вытесняются давно не использованные) и не дольше TAX_RESULT_CACHE_TTL секунд
+(по умолчанию 3600). Счётчики попаданий и промахов — stats(),
+prometheus_text() (маршрут /metrics в api.py) и панель замеров калькуляторов.
+
+    from result_cache import cached_calculate
+    cached = cached_calculate("excise", "Сигары", 10)
+    cached.result.tax_2026, cached.tax_2026  # число и «… BYN»
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from tax_engine import TaxResult, calculate
+from workbook import WORKBOOK_PATH, load_workbook
+
+MAX_ENTRIES = int(os.environ.get("TAX_RESULT_CACHE_SIZE", "4096"))
+TTL_SECONDS = float(os.environ.get("TAX_RESULT_CACHE_TTL", "3600"))
+
+# Суммы в калькуляторах: транспортный налог — в целых рублях, остальные — с копейками
+MONEY_FORMATS = {"transport": "{:,.0f} BYN"}
+MONEY_FORMAT = "{:.2f} BYN"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResult:
+    """Результат расчёта и его подписи для st.metric."""
+
+    result: TaxResult
+    tax_2025: str
+    tax_2026: str
+    growth: str
+    delta: str
+
+
+def format_result(tax, result):
+    money = MONEY_FORMATS.get(tax, MONEY_FORMAT)
+    return CachedResult(
+        result,
+        money.format(result.tax_2025),
+        money.format(result.tax_2026),
+        money.format(result.growth_abs),
+        f"+{result.growth_pct:.1f}%",
+    )
+
+
+class ResultCache:
+    """LRU-кеш с ограничением числа записей и временем жизни; потокобезопасный."""
+
+    def __init__(self, maxsize=MAX_ENTRIES, ttl=TTL_SECONDS, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # ключ -> (значение, истекает)
+        self.hits = self.misses = self.evictions = self.expired = 0
+
+    def get_or_compute(self, key, compute):
+        """Значение из кеша или compute(); исключения compute() не кешируются."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+        # Считаем без блокировки: одновременные промахи по одному ключу посчитают его дважды
+        value = compute()
+        with self._lock:
+            self._entries[key] = (value, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_cache = ResultCache()
+
+
+def cached_calculate(tax, key, quantity, path=None):
+    """tax_engine.calculate() через общий кеш: CachedResult или None, если ставок нет.
+
+    «Ставок нет» тоже кешируется; ошибки (ValueError) — нет.
+    """
+    key = tuple(key) if isinstance(key, (tuple, list)) else (key,)
+
+    def compute():
+        result = calculate(tax, key, quantity, path)
+        return None if result is None else format_result(tax, result)
+
+    # Типы значений — часть ключа: True, 1 и 1.0 равны, но calculate() их различает
+    types = tuple(type(value) for value in key) + (type(quantity),)
+    cache_key = (tax, key, quantity, types, load_workbook(path or WORKBOOK_PATH)["sha256"])
+    try:
+        hash(cache_key)
+    except TypeError:
+        # Нехешируемый ключ (словарь, вложенный список) — без кеша; calculate() выбросит TypeError
+        cache_key = None
+    if cache_key is None:
+        return compute()
+    return _cache.get_or_compute(cache_key, compute)
+
+
+def stats():
+    return _cache.stats()
+
+
+def clear():
+    _cache.clear()
+
+
+def prometheus_text():
+    """Счётчики кеша в текстовом формате Prometheus."""
+    data = stats()
+    lines = []
+    for name, help_text in (
+        ("hits", "Попадания в кеш результатов."),
+        ("misses", "Промахи кеша результатов."),
+        ("evictions", "Вытеснения из кеша результатов по размеру."),
+        ("expired", "Записи кеша результатов с истёкшим временем жизни."),
+    ):
+        metric = f"tax_calculator_result_cache_{name}_total"
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter", f"{metric} {data[name]}"]
+    lines += [
+        "# HELP tax_calculator_result_cache_entries Записей в кеше результатов.",
+        "# TYPE tax_calculator_result_cache_entries gauge",
+        f"tax_calculator_result_cache_entries {data['size']}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,91 @@
+import altair as alt
+import streamlit as st
+
+from metrics import span
+from scenarios import quantity_range, tax_grid
+from tax_engine import TAX_TYPES, rate_table
+from ui import TAX_LABELS, csv_download_button, show_metrics_sidebar
+from warmup import prime
+
+# Проверяем, это запрос для прогрева (параметр URL ?_warmup)
+if "_warmup" in st.query_params:
+    # Заполняем общие кеши: книга, индексы ставок, по одному расчёту на налог
+    st.json(prime())
+
+    # Останавливаем дальнейшее выполнение
+    st.stop()
+
+# Тепловая карта строится в браузере: больше ячеек — только таблица
+HEATMAP_MAX_CELLS = 20_000
+
+VALUE_LABELS = {
+    "tax_2026": "Налог 2026, BYN",
+    "tax_2025": "Налог 2025, BYN",
+    "growth_abs": "Рост, BYN",
+    "growth_pct": "Рост, %",
+}
+
+st.title("Сценарии: налог по всем ставкам × ряду количеств")
+
+tax = st.selectbox("Налог", TAX_TYPES, format_func=TAX_LABELS.get)
+
+try:
+    with span("load", "scenario"):
+        table = rate_table(tax)
+except Exception as e:
+    st.error(f"Ошибка при загрузке Excel: {e}")
+    st.stop()
+
+# Для двухуровневых ключей (земля, отходы) можно ограничиться одним значением первого
+prefix = ()
+if len(table.key_columns) > 1:
+    first = st.selectbox(table.key_columns[0], ["Все", *table.column_options(0)])
+    if first != "Все":
+        prefix = (first,)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    start = st.number_input("Количество от", min_value=0.0, value=0.0, step=1.0)
+with col2:
+    stop = st.number_input("Количество до", min_value=0.0, value=100.0, step=1.0)
+with col3:
+    steps = st.number_input("Шагов", min_value=1, max_value=10_000, value=21, step=1)
+
+value = st.radio("Показатель", list(VALUE_LABELS), format_func=VALUE_LABELS.get, horizontal=True)
+
+try:
+    with span("compute", "scenario"):
+        grid = tax_grid(tax, quantity_range(start, stop, steps), prefix)
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+
+if not grid.keys:
+    st.warning("Нет строк с читаемыми ставками.")
+    st.stop()
+
+with span("render", "scenario"):
+    st.caption(f"Сетка {len(grid.keys)} × {len(grid.quantities)} = {getattr(grid, value).size:,} ячеек")
+
+    if getattr(grid, value).size <= HEATMAP_MAX_CELLS:
+        chart = (
+            alt.Chart(grid.long_frame(value))
+            .mark_rect()
+            .encode(
+                x=alt.X("Количество:O", axis=alt.Axis(format=".4~g")),
+                y=alt.Y("Ставка:N", sort=None, title=None),
+                color=alt.Color("Значение:Q", title=VALUE_LABELS[value]),
+                tooltip=["Ставка", "Количество", alt.Tooltip("Значение:Q", format=",.2f")],
+            )
+        )
+        st.altair_chart(chart, width="stretch")
+    else:
+        st.info(f"Тепловая карта строится для сеток до {HEATMAP_MAX_CELLS:,} ячеек.")
+
+    frame = grid.frame(value)
+    st.dataframe(frame)
+    csv_download_button(
+        "Скачать сетку (CSV)", frame.rename_axis("Ставка").reset_index(), f"сценарии_{tax}_{value}.csv"
+    )
+
+show_metrics_sidebar()
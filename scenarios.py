@@ -0,0 +1,117 @@
+"""Сценарные сетки: налог для всех строк таблицы ставок × ряда количеств.
+
+Сетка считается broadcast-арифметикой NumPy над массивами ставок из
+индексов калькуляторов (tables.py) — без цикла по ячейкам:
+
+    from scenarios import quantity_range, tax_grid
+    grid = tax_grid("excise", quantity_range(0, 1000, 1000))
+    grid.tax_2026.shape  # (строк ставок, 1000)
+
+Рост в % — по тем же правилам, что и tax_engine.compute.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from tax_engine import RATE_GROWTH_TAXES, TAX_TYPES, UNITS, rate_table
+
+VALUES = ("tax_2025", "tax_2026", "growth_abs", "growth_pct")
+
+
+@dataclass(frozen=True)
+class ScenarioGrid:
+    tax: str
+    keys: Tuple[tuple, ...]
+    units: Tuple[str, ...]
+    quantities: np.ndarray  # (q,)
+    rate_2025: np.ndarray  # (n,)
+    rate_2026: np.ndarray  # (n,)
+    tax_2025: np.ndarray  # (n, q)
+    tax_2026: np.ndarray  # (n, q)
+    growth_abs: np.ndarray  # (n, q)
+    growth_pct: np.ndarray  # (n, q)
+
+    @property
+    def labels(self):
+        return [" / ".join(str(part).strip() for part in key) for key in self.keys]
+
+    def frame(self, value="tax_2026"):
+        """Сетка как DataFrame: строки — ключи ставок, колонки — количества."""
+        import pandas as pd
+
+        return pd.DataFrame(getattr(self, value), index=self.labels, columns=self.quantities)
+
+    def long_frame(self, value="tax_2026"):
+        """Длинный формат (ключ, количество, значение) — для тепловой карты."""
+        import pandas as pd
+
+        data = getattr(self, value)
+        return pd.DataFrame({
+            "Ставка": np.repeat(np.array(self.labels, dtype=object), len(self.quantities)),
+            "Количество": np.tile(self.quantities, len(self.keys)),
+            "Значение": data.ravel(),
+        })
+
+
+def quantity_range(start, stop, steps):
+    """Равномерный ряд количеств от start до stop включительно."""
+    if steps < 1:
+        raise ValueError("Число шагов должно быть не меньше 1")
+    return np.linspace(float(start), float(stop), int(steps))
+
+
+def tax_grid(
+    tax: str,
+    quantities: Sequence[float],
+    prefix: Sequence[str] = (),
+    keys: Optional[Sequence[tuple]] = None,
+    path: Optional[str] = None,
+) -> ScenarioGrid:
+    """Налог для строк таблицы ставок tax × количеств quantities.
+
+    По умолчанию берутся все ключи таблицы (повторы — по первой строке,
+    как в калькуляторе); prefix ограничивает их уже выбранными значениями
+    старших колонок (например, категорией земли), keys задаёт их явно.
+    Строки с нечитаемыми ставками (NaN) пропускаются.
+    """
+    if tax not in TAX_TYPES:
+        raise ValueError(f"Неизвестный налог: {tax}")
+    table = rate_table(tax, path)
+    if keys is None:
+        prefix = tuple(prefix)
+        keys = [key for key in dict.fromkeys(table.keys) if key[:len(prefix)] == prefix]
+    keys = [tuple(key) for key in keys]
+    positions = [table.position(*key) for key in keys]
+    missing = [key for key, pos in zip(keys, positions) if pos is None]
+    if missing:
+        raise ValueError(f"Нет ставок для ключей: {missing[:5]}")
+
+    pos = np.asarray(positions, dtype=np.intp)
+    rate_2025 = table.rate_2025[pos]
+    rate_2026 = table.rate_2026[pos]
+    valid = ~(np.isnan(rate_2025) | np.isnan(rate_2026))
+    if not valid.all():
+        keys = [key for key, ok in zip(keys, valid) if ok]
+        pos, rate_2025, rate_2026 = pos[valid], rate_2025[valid], rate_2026[valid]
+
+    if "unit" in table.extra:
+        units = tuple(table.value("unit", p) for p in pos.tolist())
+    else:
+        units = (UNITS[tax],) * len(keys)
+
+    q = np.asarray(quantities, dtype="float64")
+    tax_2025 = rate_2025[:, None] * q[None, :]
+    tax_2026 = rate_2026[:, None] * q[None, :]
+    growth_abs = tax_2026 - tax_2025
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if tax in RATE_GROWTH_TAXES:
+            by_rate = np.where(rate_2025 != 0, (rate_2026 - rate_2025) / rate_2025 * 100, 0.0)
+            growth_pct = np.broadcast_to(by_rate[:, None], growth_abs.shape)
+        else:
+            growth_pct = np.where(tax_2025 > 0, growth_abs / tax_2025 * 100, 0.0)
+
+    return ScenarioGrid(
+        tax, tuple(keys), units, q, rate_2025, rate_2026, tax_2025, tax_2026, growth_abs, growth_pct
+    )
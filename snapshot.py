@@ -0,0 +1,345 @@
+"""Бинарный снимок листов Налоги_таблицы.xlsx.
+
+Разбор xlsx через openpyxl — самая дорогая часть загрузки калькуляторов.
+Этот модуль один раз превращает каждый лист книги в очищенные типизированные
+массивы NumPy и сохраняет их в сжатый ``.npz``, привязанный к SHA-256 файла.
+Пока содержимое книги не меняется, калькуляторы читают только снимок.
+Числовые колонки приводятся к float64 при сборке (см. normalize.py), а отчёт
+о нечитаемых ячейках хранится в метаданных снимка.
+
+В снимок попадают и готовые индексы ставок (tables.BUILDERS). Чтение снимка
+обходится одним NumPy: листы превращаются в DataFrame только при первом
+обращении к ним, поэтому расчёт по ставкам не импортирует ни pandas, ни
+openpyxl — это заметно на холодном старте. Поэтому снимок привязан и к коду
+очистки и сборки индексов (code_fingerprint): после правки normalize.py,
+rates.py или tables.py он собирается заново.
+
+Собрать снимок вручную:
+
+    python snapshot.py [путь_к_xlsx]
+"""
+
+import functools
+import hashlib
+import json
+import os
+import sys
+import zipfile
+from collections.abc import Mapping
+from xml.etree import ElementTree
+
+import numpy as np
+
+from metrics import span
+from rates import IntervalTable, RateTable
+from tables import BUILDERS
+
+WORKBOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Налоги_таблицы.xlsx")
+SNAPSHOT_DIR = ".snapshots"
+
+# Версия формата снимка — меняется при изменении раскладки массивов
+SNAPSHOT_FORMAT = 3
+
+# Модули, от кода которых зависит содержимое снимка: очистка листов и сборка индексов
+CODE_MODULES = ("normalize.py", "rates.py", "tables.py")
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def workbook_hash(path=WORKBOOK_PATH):
+    """SHA-256 содержимого книги."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.cache
+def code_fingerprint():
+    """SHA-256 исходников CODE_MODULES: снимок, собранный другим кодом, не читается."""
+    digest = hashlib.sha256()
+    folder = os.path.dirname(os.path.abspath(__file__))
+    for name in CODE_MODULES:
+        with open(os.path.join(folder, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def snapshot_path(path, digest):
+    folder = os.path.join(os.path.dirname(os.path.abspath(path)), SNAPSHOT_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(folder, f"{stem}.{digest[:16]}.npz")
+
+
+def clean_sheet(sheet_name, df):
+    """Общая очистка листа: имена колонок, пустые строки, типы.
+
+    Возвращает (лист, отчёт о нечитаемых ячейках).
+    """
+    import pandas as pd
+
+    from normalize import normalize_sheet
+
+    df = df.dropna(how="all")
+    excel_rows = (df.index + 2).tolist()  # строка 1 — заголовок
+    df = df.reset_index(drop=True)
+    df.columns = [str(c).replace("\xa0", " ").strip() for c in df.columns]
+
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            df[col] = values.astype("float64")
+            continue
+        present = values.dropna()
+        if len(present) and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in present
+        ):
+            df[col] = values.astype("float64")
+        else:
+            # Смешанные колонки (часть ставок Excel хранит текстом) приводим к строкам
+            df[col] = values.map(lambda v: v if pd.isna(v) else str(v)).astype(object)
+    return normalize_sheet(sheet_name, df, excel_rows)
+
+
+def _encode_sheets(sheets):
+    arrays = {}
+    meta = {"format": SNAPSHOT_FORMAT, "sheets": []}
+    for i, (name, df) in enumerate(sheets.items()):
+        columns = []
+        for j, col in enumerate(df.columns):
+            key = f"s{i}_c{j}"
+            values = df[col]
+            if values.dtype == "float64":
+                arrays[key] = values.to_numpy(dtype="float64")
+                columns.append({"name": col, "kind": "f", "na": False})
+            else:
+                mask = values.isna().to_numpy()
+                arrays[key] = np.array(["" if m else v for v, m in zip(values, mask)], dtype=str)
+                if mask.any():
+                    arrays[key + "_na"] = mask
+                columns.append({"name": col, "kind": "s", "na": bool(mask.any())})
+        meta["sheets"].append({"name": name, "rows": len(df), "columns": columns})
+    return arrays, meta
+
+
+def _decode_sheet(data, i, sheet):
+    import pandas as pd
+
+    frame = {}
+    for j, col in enumerate(sheet["columns"]):
+        key = f"s{i}_c{j}"
+        values = data[key]
+        if col["kind"] == "s":
+            values = values.astype(object)
+            if col["na"]:
+                values[data[key + "_na"]] = np.nan
+            # object, как после clean_sheet: иначе pandas выведет str, и при
+            # горячей перезагрузке равные листы не совпадут по DataFrame.equals
+            values = pd.Series(values, dtype=object)
+        frame[col["name"]] = values
+    return pd.DataFrame(frame).set_axis(pd.RangeIndex(sheet["rows"]))
+
+
+class SnapshotSheets(Mapping):
+    """Листы снимка {имя: DataFrame}: лист собирается при первом обращении к нему."""
+
+    def __init__(self, data, meta):
+        self._data = data
+        self._sheets = {sheet["name"]: (i, sheet) for i, sheet in enumerate(meta["sheets"])}
+        self._frames = {}
+
+    def __getitem__(self, name):
+        frame = self._frames.get(name)
+        if frame is None:
+            i, sheet = self._sheets[name]
+            # Два потока могут собрать лист одновременно — остаётся первый
+            frame = self._frames.setdefault(name, _decode_sheet(self._data, i, sheet))
+        return frame
+
+    def __contains__(self, name):
+        return name in self._sheets
+
+    def __iter__(self):
+        return iter(self._sheets)
+
+    def __len__(self):
+        return len(self._sheets)
+
+
+def build_tables(sheets, names=None):
+    """Индексы ставок для снимка (все или names); таблицы, которые не удалось построить, пропускаются."""
+    tables = {}
+    for name in BUILDERS if names is None else names:
+        try:
+            tables[name] = BUILDERS[name](sheets)
+        except (KeyError, ValueError):
+            # Калькулятор сообщит об ошибке сам, когда построит таблицу из листов
+            continue
+    return tables
+
+
+def _encode_tables(tables, arrays):
+    meta = {}
+    for name, table in tables.items():
+        key = f"t_{name}"
+        if isinstance(table, IntervalTable):
+            arrays[key + "_labels"] = np.array(table.labels, dtype=str)
+            arrays[key + "_lower"] = table.lower
+            arrays[key + "_upper"] = table.upper
+            meta[name] = {"kind": "interval"}
+        else:
+            columns = list(zip(*table.keys)) or [()] * len(table.key_columns)
+            values = [*columns, *table.extra.values()]
+            if not all(type(v) is str for column in values for v in column):
+                # Ключи не строки (например, пустые ячейки) — такую таблицу соберём из листов
+                continue
+            for level, column in enumerate(columns):
+                arrays[f"{key}_k{level}"] = np.array(column, dtype=str)
+            for n, column in enumerate(table.extra.values()):
+                arrays[f"{key}_x{n}"] = np.array(column, dtype=str)
+            meta[name] = {"kind": "rate", "key_columns": list(table.key_columns), "extra": list(table.extra)}
+        arrays[key + "_r2025"] = table.rate_2025
+        arrays[key + "_r2026"] = table.rate_2026
+    return meta
+
+
+def _decode_tables(data, meta):
+    tables = {}
+    for name, info in meta.items():
+        key = f"t_{name}"
+        rate_2025, rate_2026 = data[key + "_r2025"], data[key + "_r2026"]
+        if info["kind"] == "interval":
+            tables[name] = IntervalTable(
+                data[key + "_labels"].tolist(), data[key + "_lower"], data[key + "_upper"], rate_2025, rate_2026
+            )
+        else:
+            levels = [data[f"{key}_k{level}"].tolist() for level in range(len(info["key_columns"]))]
+            extra = {extra: data[f"{key}_x{n}"].tolist() for n, extra in enumerate(info["extra"])}
+            tables[name] = RateTable(info["key_columns"], zip(*levels), rate_2025, rate_2026, extra)
+    return tables
+
+
+def sheet_fingerprints(path=WORKBOOK_PATH):
+    """Отпечатки листов по CRC из оглавления zip-архива xlsx (без распаковки).
+
+    Возвращает ({лист: CRC XML листа} в порядке книги, CRC общей таблицы строк).
+    Текстовые ячейки хранят только номер строки в xl/sharedStrings.xml, поэтому
+    при изменении общей таблицы строк изменённым может оказаться любой лист.
+    """
+    with zipfile.ZipFile(path) as book:
+        crc = {info.filename: info.CRC for info in book.infolist()}
+        workbook_xml = ElementTree.fromstring(book.read("xl/workbook.xml"))
+        rels_xml = ElementTree.fromstring(book.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels_xml}
+    fingerprints = {}
+    for sheet in workbook_xml.iter(f"{{{_MAIN_NS}}}sheet"):
+        target = targets.get(sheet.get(f"{{{_REL_NS}}}id"), "")
+        member = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        fingerprints[sheet.get("name")] = crc.get(member)
+    return fingerprints, crc.get("xl/sharedStrings.xml", 0)
+
+
+def parse_sheets(path=WORKBOOK_PATH, sheet_names=None):
+    """Разбор листов через openpyxl и очистка: все листы или только перечисленные.
+
+    Возвращает (листы, отчёт о нечитаемых ячейках).
+    """
+    import pandas as pd
+
+    with span("load", "openpyxl"):
+        raw = pd.read_excel(path, sheet_name=None if sheet_names is None else list(sheet_names))
+    sheets = {}
+    issues = []
+    for name, df in raw.items():
+        with span("clean", name):
+            sheets[name], sheet_issues = clean_sheet(name, df)
+        issues.extend(sheet_issues)
+    return sheets, issues
+
+
+def compile_snapshot(path=WORKBOOK_PATH, digest=None):
+    """Разбирает книгу через openpyxl и записывает снимок.
+
+    Возвращает (листы, отчёт, индексы ставок, путь).
+    """
+    digest = digest or workbook_hash(path)
+    sheets, issues = parse_sheets(path)
+    tables = build_tables(sheets)
+    return sheets, issues, tables, write_snapshot(path, digest, sheets, issues, tables)
+
+
+def write_snapshot(path, digest, sheets, issues, tables=None):
+    """Сохраняет уже очищенные листы (и индексы ставок) как снимок книги с хешем digest.
+
+    Возвращает путь или None.
+    """
+    arrays, meta = _encode_sheets(sheets)
+    meta["tables"] = _encode_tables(tables or {}, arrays)
+    meta["sha256"] = digest
+    meta["code"] = code_fingerprint()
+    meta["issues"] = issues
+    target = snapshot_path(path, digest)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, __meta__=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+        os.replace(tmp, target)
+        _remove_stale(target)
+    except OSError:
+        # Каталог только для чтения — работаем без снимка на диске
+        target = None
+    return target
+
+
+def _remove_stale(current):
+    folder = os.path.dirname(current)
+    stem = os.path.basename(current).split(".")[0]
+    for name in os.listdir(folder):
+        full = os.path.join(folder, name)
+        if name.startswith(stem + ".") and name.endswith(".npz") and full != current:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def read_snapshot(path=WORKBOOK_PATH, digest=None):
+    """(листы, отчёт, индексы ставок) из готового снимка или None, если снимка нет.
+
+    Листы — SnapshotSheets: DataFrame собирается при первом обращении.
+    """
+    digest = digest or workbook_hash(path)
+    target = snapshot_path(path, digest)
+    if not os.path.exists(target):
+        return None
+    try:
+        with np.load(target, allow_pickle=False) as data:
+            meta = json.loads(str(data["__meta__"]))
+            if (
+                meta.get("format") == SNAPSHOT_FORMAT
+                and meta.get("sha256") == digest
+                and meta.get("code") == code_fingerprint()
+            ):
+                # Снимок небольшой: массивы читаются сразу, файл не остаётся открытым
+                arrays = {name: data[name] for name in data.files}
+                return (
+                    SnapshotSheets(arrays, meta),
+                    meta.get("issues", []),
+                    _decode_tables(arrays, meta.get("tables", {})),
+                )
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else WORKBOOK_PATH
+    sheets, issues, _, target = compile_snapshot(source)
+    print(f"Снимок: {target or '(не записан)'}")
+    for name, df in sheets.items():
+        print(f"  {name}: {df.shape[0]} строк, {df.shape[1]} колонок")
+    for issue in issues:
+        print(f"  ! {issue['Лист']}, строка {issue['Строка']}, {issue['Колонка']}: {issue['Значение']!r}")
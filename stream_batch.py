@@ -0,0 +1,218 @@
+"""Потоковый пакетный расчёт больших выгрузок (акцизы, добыча, транспорт и т. д.).
+
+Входной CSV читается кусками, каждый кусок считается векторно по сводной
+таблице ставок (portfolio.py) в пуле процессов, результаты пишутся в
+CSV или Parquet по мере готовности и в исходном порядке строк. В памяти
+одновременно не больше нескольких кусков на процесс, поэтому пиковая
+память не зависит от размера файла.
+
+    python stream_batch.py выгрузка.csv результат.csv
+    python stream_batch.py акцизы.csv акцизы.parquet --tax excise \\
+        --key-column "Товар" --quantity-column "Объём" --chunksize 200000 --workers 8
+
+Колонки входа — как в сводном расчёте: Налог, Ключ, [Ключ 2], Количество.
+Если в выгрузке один налог, колонку «Налог» можно заменить параметром --tax.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from portfolio import KEY, QUANTITY, TAX, calculate_portfolio, portfolio_rate_frame
+from snapshot import WORKBOOK_PATH
+from tax_engine import TAX_TYPES
+
+DEFAULT_CHUNKSIZE = 100_000
+
+_rates = None  # сводная таблица ставок процесса-исполнителя
+
+
+def _init_worker(path):
+    """Загрузка ставок один раз на процесс пула."""
+    global _rates
+    from workbook import get_table
+
+    _rates = get_table("portfolio_rates", portfolio_rate_frame, path)
+
+
+def process_chunk(chunk, tax=None, columns=None, csv=False):
+    """Расчёт одного куска: (результат, строк, не рассчитано, итоги по налогам).
+
+    csv=True — результат сразу текстом CSV: форматирование чисел — самая
+    медленная часть записи, и так она тоже выполняется в пуле процессов.
+    """
+    if columns:
+        chunk = chunk.rename(columns=columns)
+    if tax is not None:
+        chunk = chunk.assign(**{TAX: tax})
+    result, totals = calculate_portfolio(chunk, _rates)
+    errors = int((result["Статус"] != "OK").sum())
+    if csv:
+        result_csv = result.to_csv(index=False, sep=";", decimal=",")
+        return result_csv, len(result), errors, totals.iloc[:-1]
+    return result, len(result), errors, totals.iloc[:-1]
+
+
+def _sniff_separator(path):
+    with open(path, "rb") as f:
+        header = f.readline()
+    return ";" if header.count(b";") > header.count(b",") else ","
+
+
+def read_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Куски входного CSV как DataFrame со строковыми колонками."""
+    reader = pd.read_csv(
+        path, sep=_sniff_separator(path), dtype=str, encoding="utf-8-sig", chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            chunk.columns = [str(c).replace("\xa0", " ").strip() for c in chunk.columns]
+            yield chunk
+
+
+class CsvSink:
+    # Как export.iter_csv: ; и десятичная запятая, BOM — чтобы Excel открывал без мастера
+    csv = True
+
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8-sig", newline="")
+        self.header = True
+
+    def write(self, text):
+        if not self.header:
+            # Заголовок — только из первого куска
+            text = text[text.index("\n") + 1:]
+        self.file.write(text)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    csv = False
+
+    def __init__(self, path):
+        # pyarrow нужен только для вывода в Parquet
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa, self.pq = pa, pq
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        # Текстовые колонки — строки Arrow, чтобы схема не зависела от пропусков в куске
+        text = {col: "string" for col in df.columns if df[col].dtype == object}
+        table = self.pa.Table.from_pandas(df.astype(text), preserve_index=False)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path):
+    return ParquetSink(path) if path.lower().endswith(".parquet") else CsvSink(path)
+
+
+def run(
+    source,
+    target,
+    tax=None,
+    columns=None,
+    chunksize=DEFAULT_CHUNKSIZE,
+    workers=None,
+    path=WORKBOOK_PATH,
+):
+    """Считает source в target. Возвращает сводку: строки, ошибки, итоги по налогам, время."""
+    if tax is not None and tax not in TAX_TYPES:
+        raise ValueError(f"Неизвестный налог: {tax}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    started = time.perf_counter()
+    rows = errors = 0
+    totals = []
+
+    def collect(result, chunk_rows, chunk_errors, chunk_totals):
+        nonlocal rows, errors
+        sink.write(result)
+        rows += chunk_rows
+        errors += chunk_errors
+        totals.append(chunk_totals)
+
+    sink = open_sink(target)
+    try:
+        if workers <= 1:
+            _init_worker(path)
+            for chunk in read_chunks(source, chunksize):
+                collect(*process_chunk(chunk, tax, columns, sink.csv))
+        else:
+            # Не больше двух кусков в работе на процесс: память не растёт с размером входа
+            limit = workers * 2
+            pending = deque()
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(path,)) as pool:
+                for chunk in read_chunks(source, chunksize):
+                    if len(pending) >= limit:
+                        collect(*pending.popleft().result())
+                    pending.append(pool.submit(process_chunk, chunk, tax, columns, sink.csv))
+                while pending:
+                    collect(*pending.popleft().result())
+    finally:
+        sink.close()
+
+    if totals:
+        summary = pd.concat(totals).groupby(TAX, sort=False)[["Позиций", "Налог_2025", "Налог_2026"]].sum()
+        summary = summary.reindex([t for t in TAX_TYPES if t in summary.index])
+        summary["Рост"] = summary["Налог_2026"] - summary["Налог_2025"]
+    else:
+        summary = pd.DataFrame()
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "errors": errors,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed else 0.0,
+        "totals": summary,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="входной CSV")
+    parser.add_argument("target", help="результат: .csv или .parquet")
+    parser.add_argument("--tax", choices=TAX_TYPES, help="налог для всех строк (вместо колонки «Налог»)")
+    parser.add_argument("--key-column", help=f"колонка входа с ключом ставки (вместо «{KEY}»)")
+    parser.add_argument("--quantity-column", help=f"колонка входа с количеством (вместо «{QUANTITY}»)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--workers", type=int, help="процессов (по умолчанию — число ядер; 1 — без пула)")
+    parser.add_argument("--workbook", default=WORKBOOK_PATH)
+    args = parser.parse_args()
+
+    columns = {}
+    if args.key_column:
+        columns[args.key_column] = KEY
+    if args.quantity_column:
+        columns[args.quantity_column] = QUANTITY
+
+    report = run(
+        args.source, args.target, args.tax, columns, args.chunksize, args.workers, args.workbook
+    )
+    print(
+        f"Строк: {report['rows']:,}, не рассчитано: {report['errors']:,}, "
+        f"{report['seconds']:.1f} с ({report['rows_per_second']:,.0f} строк/с)",
+        file=sys.stderr,
+    )
+    if not report["totals"].empty:
+        print(report["totals"].to_string(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Таблицы ставок калькуляторов, построенные из листов книги.
+
+Каждый построитель получает словарь листов (см. workbook.load_workbook)
+и возвращает RateTable. Вызываются через workbook.get_rate_table() —
+один раз на версию книги. Колонки ставок к этому моменту уже float64
+(см. normalize.py): нечитаемые ячейки — NaN и попадают в отчёт о качестве.
+"""
+
+import math
+import re
+
+from rates import IntervalTable, RateTable
+
+LAND_CATEGORY = "Категория сельхозугодий"
+LAND_CLASS = "Кадастровая оценка земель (общий балл)"
+VEHICLE_TYPE = "Тип транспортных средств"
+EXCISE_PRODUCT = "Подакцизный_товар"
+AIR_CLASS = "Классы опасности выбросов"
+WATER_TARGET = "Куда сбрасываются сточные воды"
+WASTE_ACTION = "Способ обращения с отходами"
+WASTE_LABEL = "Отображаемое название"
+UNIT = "Единица налогообложения"
+
+# Колонки реестров массового расчёта (bulk.py). Здесь, а не в bulk.py:
+# страницы показывают их в подсказке, не импортируя pandas
+LAND_AREA = "Площадь, га"
+LAND_COLUMNS = [LAND_CATEGORY, LAND_CLASS, LAND_AREA]
+
+OIL_MONTH = "Месяц"
+OIL_PRICE = "Цена, $/т"
+OIL_VOLUME = "Объём, т"
+OIL_COLUMNS = [OIL_MONTH, OIL_PRICE, OIL_VOLUME]
+
+
+def build_land(sheets):
+    df = sheets["Земельный налог"]
+    return RateTable.from_frame(df, [LAND_CATEGORY, LAND_CLASS], ["Ставки_2025", "Ставки_2026"])
+
+
+def build_transport(sheets):
+    df = sheets["Транспортный"].dropna(subset=["Налог_2025", "Налог_2026"])
+    return RateTable.from_frame(df, [VEHICLE_TYPE], ["Налог_2025", "Налог_2026"])
+
+
+def build_excise(sheets):
+    df = sheets["Акцизы"]
+    return RateTable.from_frame(df, [EXCISE_PRODUCT], ["Ставка_2025", "Ставка_2026"], {"unit": UNIT})
+
+
+def _build_eco(df, key_columns):
+    # Нечитаемые ставки остаются NaN: калькулятор сообщает об ошибке при выборе строки
+    return RateTable.from_frame(df, key_columns, ["Ставка_2025", "Ставка_2026"])
+
+
+def build_eco_air(sheets):
+    return _build_eco(sheets["Эконалог_воздух"], [AIR_CLASS])
+
+
+def build_eco_water(sheets):
+    return _build_eco(sheets["Эконалог_сточные"], [WATER_TARGET])
+
+
+def format_waste_labels(df):
+    """«вид (категория)» или просто категория, если конкретный вид не указан."""
+    cat = df["Категории отходов"].astype(str)
+    spec = df["Конкретный вид отхода"].fillna("").astype(str)
+    return cat.where(spec == "", spec + " (" + cat + ")")
+
+
+def build_eco_waste(sheets):
+    df = sheets["Эконалог_захоронение"]
+    df = df.assign(**{WASTE_LABEL: format_waste_labels(df)})
+    return _build_eco(df, [WASTE_ACTION, WASTE_LABEL])
+
+
+def find_columns(df, patterns):
+    """Автоопределение колонок: {роль: [подстроки]} -> {роль: колонка}."""
+    found = {}
+    for col in df.columns:
+        for role, parts in patterns.items():
+            if role not in found and all(part in col for part in parts):
+                found[role] = col
+                break
+    missing = [" ".join(parts) for role, parts in patterns.items() if role not in found]
+    if missing:
+        raise ValueError(f"Не найдены колонки: {', '.join(missing)}")
+    return found
+
+
+def build_oil(sheets):
+    df = sheets["Ставки на нефть"]
+    cols = find_columns(df, {
+        "price": ["Средняя цена", "$"],
+        "rate_2025": ["Ставка_2025", "BYN"],
+        "rate_2026": ["Ставка_2026", "BYN"],
+    })
+    df = df.dropna(subset=[cols["rate_2025"], cols["rate_2026"]])
+    df = df.assign(**{cols["price"]: df[cols["price"]].astype(str)})
+    return RateTable.from_frame(df, [cols["price"]], [cols["rate_2025"], cols["rate_2026"]])
+
+
+_PRICE_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def parse_price_range(label):
+    """«До 578,4» / «От 578,4 до 650,7» / «Свыше 1446,0» -> (нижняя, верхняя граница)."""
+    text = str(label).replace("\xa0", "").replace(" ", "").lower()
+    numbers = [float(n.replace(",", ".")) for n in _PRICE_NUMBER.findall(text)]
+    if text.startswith("до") and len(numbers) == 1:
+        return -math.inf, numbers[0]
+    if text.startswith("от") and len(numbers) == 2:
+        return numbers[0], numbers[1]
+    if text.startswith(("свыше", "от", "более")) and len(numbers) == 1:
+        return numbers[0], math.inf
+    raise ValueError(f"Не удалось разобрать ценовой диапазон: {label}")
+
+
+def build_oil_prices(sheets):
+    """Ставки на нефть по числовой цене, $ за 1000 кг (двоичный поиск по интервалам)."""
+    table = build_oil(sheets)
+    # Повторы диапазона — по первой строке, как в калькуляторе
+    keys = list(dict.fromkeys(table.keys))
+    labels = [key[0] for key in keys]
+    positions = [table.position(*key) for key in keys]
+    lower, upper = zip(*(parse_price_range(label) for label in labels)) if labels else ((), ())
+    return IntervalTable(
+        labels, lower, upper, table.rate_2025[positions], table.rate_2026[positions]
+    )
+
+
+def build_mining(sheets):
+    df = sheets["Добыча_ресурсов"]
+    cols = find_columns(df, {
+        "resource": ["Природные ресурсы"],
+        "rate_2025": ["Ставка_2025"],
+        "rate_2026": ["Ставка_2026"],
+        "unit": [UNIT],
+    })
+    df = df.dropna(subset=[cols["rate_2025"], cols["rate_2026"]])
+    df = df.assign(**{
+        cols["resource"]: df[cols["resource"]].astype(str),
+        cols["unit"]: df[cols["unit"]].fillna("единица").astype(str),
+    })
+    return RateTable.from_frame(
+        df, [cols["resource"]], [cols["rate_2025"], cols["rate_2026"]], {"unit": cols["unit"]}
+    )
+
+
+# Листы, из которых строится каждая таблица: при горячей перезагрузке книги
+# (workbook.py) пересобираются только таблицы изменившихся листов
+SHEETS = {
+    "land": ("Земельный налог",),
+    "transport": ("Транспортный",),
+    "excise": ("Акцизы",),
+    "eco_air": ("Эконалог_воздух",),
+    "eco_water": ("Эконалог_сточные",),
+    "eco_waste": ("Эконалог_захоронение",),
+    "oil": ("Ставки на нефть",),
+    "oil_prices": ("Ставки на нефть",),
+    "mining": ("Добыча_ресурсов",),
+}
+
+BUILDERS = {
+    "land": build_land,
+    "transport": build_transport,
+    "excise": build_excise,
+    "eco_air": build_eco_air,
+    "eco_water": build_eco_water,
+    "eco_waste": build_eco_waste,
+    "oil": build_oil,
+    "oil_prices": build_oil_prices,
+    "mining": build_mining,
+}
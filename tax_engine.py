@@ -0,0 +1,215 @@
+"""Расчёт налогов без Streamlit.
+
+Функции модуля используются калькуляторами, пакетными заданиями и
+другими сервисами. Импорт модуля не тянет ни streamlit, ни pandas:
+книга и индексы ставок загружаются при первом расчёте (см. workbook.py).
+
+    from tax_engine import excise_tax
+    excise_tax("Сигары", 10).tax_2026
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+from metrics import span
+
+ECO_KINDS = {
+    # вид -> (таблица ставок, единица объёма)
+    "air": ("eco_air", "тонн"),
+    "water": ("eco_water", "м³"),
+    "waste": ("eco_waste", "тонн"),
+}
+
+
+# slots: без словаря экземпляра — результаты создаются на каждый расчёт
+@dataclass(frozen=True, slots=True)
+class TaxResult:
+    rate_2025: float
+    rate_2026: float
+    quantity: float
+    unit: str
+    tax_2025: float
+    tax_2026: float
+    growth_abs: float
+    growth_pct: float
+
+
+def rate_table(name, path=None):
+    """Индекс ставок (RateTable) по имени из tables.BUILDERS — для списков вариантов."""
+    # Отложенный импорт: загрузка книги нужна только при расчёте
+    from workbook import get_rate_table
+
+    return get_rate_table(name) if path is None else get_rate_table(name, path)
+
+
+def compute(
+    rate_2025: float,
+    rate_2026: float,
+    quantity: float,
+    unit: str = "",
+    growth_from_rates: bool = False,
+) -> TaxResult:
+    """Налог за 2025 и 2026 годы по ставкам и количеству.
+
+    growth_from_rates: рост в % считается по ставкам (транспорт, нефть,
+    добыча), иначе — по сумме налога 2025 года.
+    """
+    tax_2025 = rate_2025 * quantity
+    tax_2026 = rate_2026 * quantity
+    growth_abs = tax_2026 - tax_2025
+    if growth_from_rates:
+        growth_pct = ((rate_2026 - rate_2025) / rate_2025 * 100) if rate_2025 != 0 else 0
+    else:
+        growth_pct = (growth_abs / tax_2025 * 100) if tax_2025 > 0 else 0
+    return TaxResult(rate_2025, rate_2026, quantity, unit, tax_2025, tax_2026, growth_abs, growth_pct)
+
+
+def land_tax(category: str, klass: str, area: float, path: Optional[str] = None) -> Optional[TaxResult]:
+    """Земельный налог; None, если для пары (категория, класс) нет ставок."""
+    with span("lookup", "land"):
+        rates = rate_table("land", path).lookup(category, klass)
+    if rates is None:
+        return None
+    with span("compute", "land"):
+        return compute(*rates, area, "га")
+
+
+def transport_tax(vehicle_type: str, count: float, path: Optional[str] = None) -> Optional[TaxResult]:
+    with span("lookup", "transport"):
+        rates = rate_table("transport", path).lookup(vehicle_type)
+    if rates is None:
+        return None
+    with span("compute", "transport"):
+        return compute(*rates, count, "ед.", growth_from_rates=True)
+
+
+def excise_tax(product: str, quantity: float, path: Optional[str] = None) -> Optional[TaxResult]:
+    with span("lookup", "excise"):
+        table = rate_table("excise", path)
+        pos = table.position(product)
+    if pos is None:
+        return None
+    with span("compute", "excise"):
+        return compute(*table.rates_at(pos), quantity, table.value("unit", pos))
+
+
+def eco_tax(
+    kind: str,
+    key: Union[str, Tuple[str, str]],
+    quantity: float,
+    path: Optional[str] = None,
+) -> Optional[TaxResult]:
+    """Экологический налог.
+
+    kind: "air", "water" или "waste"; для отходов key — пара
+    (способ обращения, отображаемое название отхода).
+    """
+    if kind not in ECO_KINDS:
+        raise ValueError(f"Неизвестный вид экологического налога: {kind}")
+    name, unit = ECO_KINDS[kind]
+    key = tuple(key) if isinstance(key, (tuple, list)) else (key,)
+    with span("lookup", name):
+        rates = rate_table(name, path).lookup(*key)
+    if rates is None:
+        return None
+    rate_2025, rate_2026 = rates
+    if math.isnan(rate_2025) or math.isnan(rate_2026):
+        raise ValueError("Не удалось прочитать ставки. Проверьте Excel.")
+    with span("compute", name):
+        return compute(rate_2025, rate_2026, quantity, unit)
+
+
+def oil_tax(price_range: str, quantity: float, path: Optional[str] = None) -> Optional[TaxResult]:
+    """Налог за добычу нефти по ценовому диапазону; quantity — тонны."""
+    with span("lookup", "oil"):
+        rates = rate_table("oil", path).lookup(price_range)
+    if rates is None:
+        return None
+    with span("compute", "oil"):
+        return compute(*rates, quantity, "тонн", growth_from_rates=True)
+
+
+def oil_price_range(price: float, path: Optional[str] = None) -> Optional[str]:
+    """Ценовой диапазон листа «Ставки на нефть», в который попадает цена ($ за 1000 кг)."""
+    if price < 0:
+        return None
+    table = rate_table("oil_prices", path)
+    pos = table.position(price)
+    return None if pos is None else table.labels[pos]
+
+
+def oil_tax_by_price(price: float, quantity: float, path: Optional[str] = None) -> Optional[TaxResult]:
+    """Налог за добычу нефти по средней цене ($ за 1000 кг) вместо выбора диапазона."""
+    if price < 0:
+        return None
+    with span("lookup", "oil_prices"):
+        rates = rate_table("oil_prices", path).lookup(price)
+    if rates is None:
+        return None
+    with span("compute", "oil"):
+        return compute(*rates, quantity, "тонн", growth_from_rates=True)
+
+
+def mining_tax(resource: str, quantity: float, path: Optional[str] = None) -> Optional[TaxResult]:
+    with span("lookup", "mining"):
+        table = rate_table("mining", path)
+        pos = table.position(resource)
+    if pos is None:
+        return None
+    with span("compute", "mining"):
+        return compute(*table.rates_at(pos), quantity, table.value("unit", pos), growth_from_rates=True)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+TAX_TYPES = ("land", "transport", "excise", "eco_air", "eco_water", "eco_waste", "oil", "mining")
+
+# Налоги, у которых рост в % считается по ставкам (growth_from_rates в compute)
+RATE_GROWTH_TAXES = frozenset({"transport", "oil", "mining"})
+
+# Единица количества; у акцизов и добычи — своя в каждой строке (RateTable.value("unit", ...))
+UNITS = {
+    "land": "га",
+    "transport": "ед.",
+    "eco_air": ECO_KINDS["air"][1],
+    "eco_water": ECO_KINDS["water"][1],
+    "eco_waste": ECO_KINDS["waste"][1],
+    "oil": "тонн",
+}
+
+
+def calculate(
+    tax: str,
+    key: Union[str, Sequence[str]],
+    quantity: float,
+    path: Optional[str] = None,
+) -> Optional[TaxResult]:
+    """Единая точка расчёта по имени налога (как в TAX_TYPES) и ключу строки ставок.
+
+    Ключ — строка или список значений ключевых колонок: для земли
+    [категория, класс], для отходов [способ обращения, название отхода].
+    Для нефти ключом может быть и число — средняя цена, $ за 1000 кг.
+    """
+    key = tuple(key) if isinstance(key, (tuple, list)) else (key,)
+    if tax == "land":
+        if len(key) != 2:
+            raise ValueError("Для земельного налога ключ — [категория, класс]")
+        return land_tax(key[0], key[1], quantity, path)
+    if tax == "oil" and len(key) == 1 and _is_number(key[0]):
+        return oil_tax_by_price(float(key[0]), quantity, path)
+    if tax.startswith("eco_") and tax[4:] in ECO_KINDS:
+        return eco_tax(tax[4:], key, quantity, path)
+    single = {
+        "transport": transport_tax,
+        "excise": excise_tax,
+        "oil": oil_tax,
+        "mining": mining_tax,
+    }
+    if tax not in single:
+        raise ValueError(f"Неизвестный налог: {tax}")
+    if len(key) != 1:
+        raise ValueError(f"Для налога {tax} ключ — одно значение")
+    return single[tax](key[0], quantity, path)
@@ -0,0 +1,91 @@
+import json
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import api
+
+
+def post(path, body):
+    return api.handle("POST", path, {}, body)
+
+
+def test_calculate_oil_by_price():
+    status, result = post("/calculate/oil", {"key": 700.0, "quantity": 2})
+    assert status == 200
+    assert result["quantity"] == 2.0
+    assert result["tax_2026"] == pytest.approx(result["rate_2026"] * 2)
+
+
+@pytest.mark.parametrize("key", [{"a": 1}, [["x"]], True, None, float("nan"), 10**400])
+def test_bad_key_is_400(key):
+    status, payload = post("/calculate/excise", {"key": key})
+    assert status == 400, payload
+
+
+@pytest.mark.parametrize("quantity", [float("nan"), float("inf"), 10**400, -1, "1", True])
+def test_bad_quantity_is_400(quantity):
+    status, payload = post("/calculate/oil", {"key": 700.0, "quantity": quantity})
+    assert status == 400, payload
+
+
+def test_result_out_of_float_range_is_400():
+    assert post("/calculate/oil", {"key": 700.0, "quantity": 1e308})[0] == 400
+
+
+def test_batch_reports_bad_items_separately():
+    status, payload = post("/batch", {"items": [
+        {"tax": "excise", "key": {"a": 1}},
+        {"tax": "oil", "key": 700.0, "quantity": 10**400},
+        {"tax": "oil", "key": 700.0},
+    ]})
+    assert status == 200
+    assert [item["ok"] for item in payload["results"]] == [False, False, True]
+    assert payload["errors"] == 2
+
+
+def test_encode_rejects_nan():
+    with pytest.raises(ValueError):
+        api._encode({"x": float("nan")})
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), api.Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def raw_request(address, head, body=b""):
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(head.encode("ascii") + b"\r\n\r\n" + body)
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    status_line, _, rest = data.partition(b"\r\n")
+    return int(status_line.split()[1]), json.loads(rest.partition(b"\r\n\r\n")[2])
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_bad_content_length_is_400(server, length):
+    status, payload = raw_request(
+        server, f"POST /calculate/oil HTTP/1.1\r\nHost: x\r\nContent-Length: {length}"
+    )
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+
+
+def test_http_calculate(server):
+    body = json.dumps({"key": 700.0, "quantity": 1}).encode()
+    status, payload = raw_request(
+        server,
+        f"POST /calculate/oil HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\nConnection: close",
+        body,
+    )
+    assert status == 200
+    assert payload["quantity"] == 1.0
@@ -0,0 +1,20 @@
+import io
+import warnings
+
+from bulk import read_register
+
+
+def test_read_register_from_path_closes_file(tmp_path):
+    path = tmp_path / "реестр.csv"
+    path.write_bytes("\ufeffКлюч;Количество\nСигары;1,5\n".encode("utf-8"))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        df = read_register(str(path))
+    assert list(df.columns) == ["Ключ", "Количество"]
+    assert df.iloc[0].tolist() == ["Сигары", "1,5"]
+
+
+def test_read_register_from_upload_with_comma_separator():
+    upload = io.BytesIO("Ключ,Количество\nСигары,2\n".encode("utf-8"))
+    upload.name = "реестр.csv"
+    assert read_register(upload).iloc[0].tolist() == ["Сигары", "2"]
@@ -0,0 +1,60 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+import ui
+from export import frame_sheet, iter_csv, rate_report, write_csv, write_xlsx
+
+
+@pytest.fixture
+def download_data(monkeypatch):
+    """data= последней кнопки st.download_button, вызванный как при нажатии."""
+    calls = []
+    monkeypatch.setattr(ui.st, "download_button", lambda label, data, **kwargs: calls.append(data))
+
+    def run():
+        data = calls[-1]()
+        # Так же отложенный data= обрабатывает MediaFileManager.execute_deferred
+        content, _ = convert_data_to_bytes_and_infer_mime(data, unsupported_error=TypeError(type(data)))
+        return content
+
+    return run
+
+
+def test_xlsx_button_returns_supported_data(download_data):
+    df = pd.DataFrame({"Ключ": ["a", "b"], "Налог": [1.5, np.nan]})
+    ui.xlsx_download_button("XLSX", lambda: ui.frames_report({"Лист": df}), "x.xlsx")
+    book = load_workbook(io.BytesIO(download_data()))
+    assert [list(row) for row in book["Лист"].values] == [["Ключ", "Налог"], ["a", 1.5], ["b", None]]
+
+
+def test_csv_button_returns_supported_data(download_data):
+    df = pd.DataFrame({"Ключ": ["a;b"], "Налог": [np.float64(1.5)], "Штук": [2]})
+    ui.csv_download_button("CSV", df, "x.csv")
+    assert download_data() == '\ufeffКлюч;Налог;Штук\r\n"a;b";1,5;2\r\n'.encode("utf-8")
+
+
+def test_iter_csv_batches():
+    rows = ([i, i / 2] for i in range(5))
+    chunks = list(iter_csv(["n", "half"], rows, batch=2))
+    assert len(chunks) == 4
+    assert b"".join(chunks).decode("utf-8-sig").splitlines()[1:3] == ["0;0,0", "1;0,5"]
+
+
+def test_rate_report_sheets():
+    report = rate_report(quantity=2.0, taxes=("excise",))
+    header, rows = report["Акцизы"]
+    rows = list(rows)
+    assert header[-8:] == ["Единица", "Ставка_2025", "Ставка_2026", "Количество",
+                           "Налог_2025", "Налог_2026", "Рост", "Рост_%"]
+    assert rows and all(row[len(header) - 5] == 2.0 for row in rows)
+
+
+def test_write_to_target():
+    target = io.BytesIO()
+    assert write_xlsx({"Лист": frame_sheet(pd.DataFrame({"a": [1]}))}, target) is target
+    assert write_csv(["a"], iter([[1]]), io.BytesIO()).read().endswith(b"a\r\n1\r\n")
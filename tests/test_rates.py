@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rates import IntervalTable, RateTable
+from tables import build_oil_prices, parse_price_range
+from workbook import load_workbook
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("До 578,4 ", (-math.inf, 578.4)),
+    ("От 578,4 до 650,7", (578.4, 650.7)),
+    ("от\xa01 012,2 до 1 084,5", (1012.2, 1084.5)),
+    ("Свыше 1446,0", (1446.0, math.inf)),
+    ("более 10", (10.0, math.inf)),
+])
+def test_parse_price_range(label, expected):
+    assert parse_price_range(label) == expected
+
+
+@pytest.mark.parametrize("label", ["", "Цена", "От 1 до 2 до 3"])
+def test_parse_price_range_rejects_garbage(label):
+    with pytest.raises(ValueError):
+        parse_price_range(label)
+
+
+@pytest.fixture
+def intervals():
+    # Интервалы заданы не по порядку: таблица сортирует их сама
+    return IntervalTable(
+        ["Свыше 20", "До 10", "От 10 до 20"],
+        [20, -math.inf, 10],
+        [math.inf, 10, 20],
+        [3.0, 1.0, 2.0],
+        [30.0, 10.0, 20.0],
+    )
+
+
+@pytest.mark.parametrize("value, label", [
+    (-5, "До 10"),
+    (10, "До 10"),  # верхняя граница входит в интервал
+    (10.000001, "От 10 до 20"),  # нижняя — нет
+    (20, "От 10 до 20"),
+    (1e9, "Свыше 20"),
+])
+def test_interval_boundaries(intervals, value, label):
+    assert intervals.labels[intervals.position(value)] == label
+
+
+def test_interval_positions_match_position(intervals):
+    values = [-5, 10, 10.5, 20, 25, float("nan")]
+    expected = [-1 if intervals.position(v) is None else intervals.position(v) for v in values]
+    assert intervals.positions(values).tolist() == expected
+
+
+def test_interval_gap_and_nan():
+    table = IntervalTable(["a", "b"], [0, 20], [10, 30], [1, 2], [1, 2])
+    assert table.position(15) is None
+    assert table.position(0) is None
+    assert table.position(float("nan")) is None
+    assert table.lookup(30) == (2.0, 2.0)
+
+
+def test_overlapping_intervals_rejected():
+    with pytest.raises(ValueError):
+        IntervalTable(["a", "b"], [0, 5], [10, 20], [1, 2], [1, 2])
+
+
+def test_rate_table_first_row_wins():
+    df = pd.DataFrame({"k": ["a", "b", "a"], "r25": [1.0, 2.0, 9.0], "r26": [1.5, 2.5, 9.5]})
+    table = RateTable.from_frame(df, ["k"], ["r25", "r26"])
+    assert table.lookup("a") == (1.0, 1.5)
+    assert table.lookup("нет") is None
+
+
+def test_oil_prices_repeated_range_takes_first_row():
+    sheets = dict(load_workbook()["sheets"])
+    oil = sheets["Ставки на нефть"]
+    repeated = oil.iloc[[0]].copy()
+    repeated[[c for c in oil.columns if "2025" in str(c) or "2026" in str(c)]] = 999.0
+    sheets["Ставки на нефть"] = pd.concat([oil, repeated], ignore_index=True)
+
+    table = build_oil_prices(sheets)
+    original = build_oil_prices(dict(load_workbook()["sheets"]))
+    assert table.labels == original.labels
+    assert np.array_equal(table.rate_2025, original.rate_2025)
@@ -0,0 +1,111 @@
+import pytest
+
+import result_cache
+from result_cache import ResultCache, cached_calculate
+from tax_engine import calculate, rate_table
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def counted():
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return value
+        return run
+
+    compute.calls = calls
+    return compute
+
+
+def test_hit_skips_compute(counted):
+    cache = ResultCache(maxsize=4, ttl=60, clock=Clock())
+    assert cache.get_or_compute("a", counted(1)) == 1
+    assert cache.get_or_compute("a", counted(2)) == 1
+    assert counted.calls == [1]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction(counted):
+    cache = ResultCache(maxsize=2, ttl=60, clock=Clock())
+    cache.get_or_compute("a", counted("a"))
+    cache.get_or_compute("b", counted("b"))
+    cache.get_or_compute("a", counted("a"))  # «a» свежее «b»
+    cache.get_or_compute("c", counted("c"))  # вытесняет «b»
+    cache.get_or_compute("a", counted("a"))
+    cache.get_or_compute("b", counted("b"))
+    assert counted.calls == ["a", "b", "c", "b"]
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 2
+
+
+def test_ttl_expiry(counted):
+    clock = Clock()
+    cache = ResultCache(maxsize=4, ttl=10, clock=clock)
+    cache.get_or_compute("a", counted(1))
+    clock.now = 9.9
+    assert cache.get_or_compute("a", counted(2)) == 1
+    clock.now = 10.0
+    assert cache.get_or_compute("a", counted(3)) == 3
+    assert cache.stats()["expired"] == 1
+
+
+def test_exceptions_are_not_cached():
+    cache = ResultCache(maxsize=4, ttl=60, clock=Clock())
+
+    def fail():
+        raise ValueError("нет ставок")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("a", fail)
+    assert cache.get_or_compute("a", lambda: 1) == 1
+    assert cache.stats()["size"] == 1
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = ResultCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(result_cache, "_cache", cache)
+    return cache
+
+
+def test_cached_calculate_matches_engine(shared_cache):
+    key = rate_table("excise").keys[0]
+    first = cached_calculate("excise", key, 10.0)
+    assert first.result == calculate("excise", key, 10.0)
+    assert first.tax_2026 == f"{first.result.tax_2026:.2f} BYN"
+    # Строка и список — один и тот же ключ
+    assert cached_calculate("excise", list(key), 10.0) is first
+    assert shared_cache.stats()["hits"] == 1
+
+
+def test_cached_calculate_distinguishes_value_types(shared_cache):
+    by_price = cached_calculate("oil", 1, 1.0)
+    assert by_price is not None
+    # True == 1, но для calculate() это метка диапазона, а не цена
+    assert cached_calculate("oil", True, 1.0) is None
+    assert cached_calculate("oil", 1, 1.0) is by_price
+    assert shared_cache.stats()["size"] == 2
+
+
+def test_transport_amounts_are_whole_rubles(shared_cache):
+    key = rate_table("transport").keys[0]
+    cached = cached_calculate("transport", key, 3)
+    assert cached.tax_2025 == f"{cached.result.tax_2025:,.0f} BYN"
+
+
+def test_unhashable_key_is_not_cached(shared_cache):
+    with pytest.raises(TypeError):
+        cached_calculate("excise", [{"a": 1}], 1.0)
+    assert shared_cache.stats()["misses"] == 0
@@ -0,0 +1,32 @@
+import shutil
+
+import pytest
+
+import snapshot
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = str(tmp_path / "Налоги_таблицы.xlsx")
+    shutil.copy(snapshot.WORKBOOK_PATH, path)
+    return path
+
+
+def test_snapshot_round_trip(book):
+    sheets, issues, tables, target = snapshot.compile_snapshot(book)
+    assert target is not None
+    loaded_sheets, loaded_issues, loaded_tables = snapshot.read_snapshot(book)
+    assert loaded_issues == issues
+    assert set(loaded_tables) == set(tables) == set(snapshot.BUILDERS)
+    for name, df in sheets.items():
+        assert loaded_sheets[name].equals(df)
+    excise = tables["excise"]
+    key = excise.keys[0]
+    assert loaded_tables["excise"].lookup(*key) == excise.lookup(*key)
+
+
+def test_snapshot_from_other_code_is_ignored(book, monkeypatch):
+    snapshot.compile_snapshot(book)
+    assert snapshot.read_snapshot(book) is not None
+    monkeypatch.setattr(snapshot, "code_fingerprint", lambda: "другой код")
+    assert snapshot.read_snapshot(book) is None
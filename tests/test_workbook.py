@@ -0,0 +1,76 @@
+import os
+import re
+import shutil
+import zipfile
+
+import pytest
+
+import snapshot
+import workbook
+from tables import BUILDERS, SHEETS
+
+
+@pytest.fixture
+def book(tmp_path):
+    path = str(tmp_path / "Налоги_таблицы.xlsx")
+    shutil.copy(workbook.WORKBOOK_PATH, path)
+    return path
+
+
+def change_number(path, sheet_name):
+    """Меняет первое числовое значение листа прямо в XML архива, остальные части — байт в байт."""
+    names, _ = snapshot.sheet_fingerprints(path)
+    with zipfile.ZipFile(path) as book:
+        parts = [(info, book.read(info)) for info in book.infolist()]
+    member = next(info.filename for info, _ in parts if info.CRC == names[sheet_name])
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as book:
+        for info, data in parts:
+            if info.filename == member:
+                data = re.sub(
+                    rb'(<c r="[A-Z]+\d+"(?: s="\d+")?><v>)(\d+)(</v>)',
+                    lambda m: m[1] + str(int(m[2]) + 1).encode() + m[3],
+                    data,
+                    count=1,
+                )
+            book.writestr(info, data)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_cold_start_keeps_snapshot_tables(book, monkeypatch):
+    entry = workbook.load_workbook(book)
+    assert entry["stats"]["source"] == "openpyxl"
+    assert set(entry["tables"]) == set(BUILDERS)
+
+    def fail(sheets):
+        raise AssertionError("индекс собран повторно")
+
+    monkeypatch.setitem(BUILDERS, "excise", fail)
+    assert workbook.get_rate_table("excise", book) is entry["tables"]["excise"]
+
+
+def test_reload_parses_and_rebuilds_only_changed_sheet(book):
+    old = workbook.load_workbook(book)
+    old_tables = dict(old["tables"])
+    change_number(book, "Транспортный")
+
+    new = workbook.load_workbook(book)
+    assert new["sha256"] != old["sha256"]
+    assert new["stats"]["source"] == f"openpyxl: 1 из {len(old['sheets'])} листов"
+    assert new["stats"]["changed"] == ["Транспортный"]
+    for name in BUILDERS:
+        if "Транспортный" in SHEETS[name]:
+            assert new["tables"][name] is not old_tables[name]
+        else:
+            assert new["tables"][name] is old_tables[name]
+    # Новый снимок содержит все индексы и читается без openpyxl
+    assert set(snapshot.read_snapshot(book)[2]) == set(BUILDERS)
+
+
+def test_reload_same_content_keeps_entry(book):
+    old = workbook.load_workbook(book)
+    stat = os.stat(book)
+    os.utime(book, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    new = workbook.load_workbook(book)
+    assert new["tables"] is old["tables"]
+    assert new["mtime"] != old["mtime"]
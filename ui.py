@@ -0,0 +1,100 @@
+"""Общие элементы интерфейса калькуляторов."""
+
+import streamlit as st
+
+import metrics
+import result_cache
+from export import frame_sheet, rate_report, write_csv, write_xlsx
+from workbook import quality_issues
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Названия налогов из tax_engine.TAX_TYPES для интерфейса
+TAX_LABELS = {
+    "land": "Земельный налог",
+    "transport": "Транспортный налог",
+    "excise": "Акцизы",
+    "eco_air": "Эконалог: выбросы в атмосферу",
+    "eco_water": "Эконалог: сброс сточных вод",
+    "eco_waste": "Эконалог: обращение с отходами",
+    "oil": "Налог за добычу нефти",
+    "mining": "Налог за добычу природных ресурсов",
+}
+
+
+def show_quality_report(*sheet_names):
+    """Предупреждение со списком ячеек листов, которые не удалось прочитать как числа."""
+    issues = quality_issues(*sheet_names)
+    if issues:
+        with st.expander(f"⚠️ Не удалось прочитать ячеек в Excel: {len(issues)}"):
+            st.caption("Строки с такими ставками не участвуют в расчёте.")
+            st.dataframe(issues, hide_index=True)
+
+
+def show_metrics_sidebar():
+    """Панель замеров времени в боковой колонке (только при TAX_METRICS=1)."""
+    if not metrics.ENABLED:
+        return
+    with st.sidebar.expander("⏱ Замеры времени"):
+        spans = metrics.as_dict()["spans"]
+        st.dataframe(
+            [
+                {"Этап": s["stage"], "Цель": s["target"], "Вызовов": s["count"], "Среднее, мс": s["mean_ms"]}
+                for s in spans
+            ],
+            hide_index=True,
+        )
+        cache = result_cache.stats()
+        st.caption(
+            f"Кеш результатов: {cache['size']} из {cache['maxsize']}, "
+            f"попаданий {cache['hits']}, промахов {cache['misses']}, вытеснено {cache['evictions']}"
+        )
+        if metrics.METRICS_FILE and st.button("Сохранить в JSON"):
+            st.caption(f"Записано: {metrics.dump_json()}")
+
+
+def xlsx_download_button(label, build_report, file_name):
+    """Кнопка выгрузки XLSX: build_report() -> {лист: (заголовок, строки)}.
+
+    Файл собирается только по нажатию и в отдельном потоке (data=callable),
+    поэтому большой отчёт не задерживает перезапуск страницы.
+    """
+    st.download_button(
+        label,
+        data=lambda: _file_bytes(write_xlsx(build_report())),
+        file_name=file_name,
+        mime=XLSX_MIME,
+        on_click="ignore",
+    )
+
+
+def csv_download_button(label, df, file_name):
+    """Кнопка выгрузки таблицы в CSV: файл пишется кусками по нажатию, как и XLSX."""
+    st.download_button(
+        label,
+        data=lambda: _file_bytes(write_csv(*frame_sheet(df))),
+        file_name=file_name,
+        mime="text/csv",
+        on_click="ignore",
+    )
+
+
+def _file_bytes(file):
+    # Отложенный data= принимает bytes, BytesIO и т. п., но не SpooledTemporaryFile
+    with file:
+        return file.read()
+
+
+def frames_report(frames):
+    """Отчёт из таблиц расчёта: {название листа: DataFrame} -> по листу на таблицу."""
+    return {title: frame_sheet(df) for title, df in frames.items()}
+
+
+def show_rate_report_sidebar():
+    """Выгрузка ставок 2025/2026 всех налогов с расчётом на единицу в боковой колонке."""
+    with st.sidebar:
+        xlsx_download_button(
+            "Ставки 2025–2026 по всем налогам (XLSX)",
+            lambda: rate_report(quantity=1.0),
+            "ставки_2025_2026.xlsx",
+        )
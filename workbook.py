@@ -0,0 +1,258 @@
+"""Общий загрузчик книги Налоги_таблицы.xlsx для всех калькуляторов.
+
+Книга читается один раз за проход (все листы сразу, через снимок из
+snapshot.py) и хранится в кеше уровня процесса с ключом по mtime файла.
+Streamlit выполняет сессии в потоках одного процесса, поэтому все сессии
+получают одни и те же объекты: таблицы из кеша нельзя изменять на месте.
+
+Производные таблицы калькуляторов (очищенные ставки, подписи и т. п.)
+строятся через get_table() — тоже один раз на версию книги. Индексы ставок
+калькуляторов (см. tables.py) доступны через get_rate_table().
+
+Горячая перезагрузка: если файл книги заменили, при следующем обращении
+(или раньше — из фонового потока start_watcher) заново разбираются только
+листы, у которых изменился XML в архиве xlsx, и пересобираются только
+таблицы, построенные из действительно изменившихся листов. Новая версия
+подменяет старую одним присваиванием: сессии, которые уже получили старые
+таблицы, дорабатывают на них.
+
+Сколько памяти занимает каждый лист и таблица кеша — memory_report()
+(раздел memory в bench.py, маршрут /memory в api.py).
+"""
+
+import os
+import sys
+import threading
+import time
+
+from metrics import span
+from snapshot import (
+    WORKBOOK_PATH,
+    build_tables,
+    compile_snapshot,
+    parse_sheets,
+    read_snapshot,
+    sheet_fingerprints,
+    workbook_hash,
+    write_snapshot,
+)
+from tables import BUILDERS, SHEETS
+
+_lock = threading.Lock()
+_cache = {}  # путь -> {"mtime": ..., "sheets": {...}, "tables": {...}}
+_deps = {}  # имя таблицы -> листы, из которых она строится (None — вся книга)
+_watchers = {}  # путь -> поток start_watcher
+
+
+def load_workbook(path=WORKBOOK_PATH):
+    mtime = os.stat(path).st_mtime_ns
+    entry = _cache.get(path)
+    if entry is None or entry["mtime"] != mtime:
+        with _lock:
+            entry = _cache.get(path)
+            if entry is None or entry["mtime"] != mtime:
+                with span("load", "workbook"):
+                    entry = _read(path, mtime) if entry is None else _reload(path, mtime, entry)
+                _cache[path] = entry
+    return entry
+
+
+def is_loaded(path=WORKBOOK_PATH):
+    """Есть ли в кеше актуальная версия книги."""
+    entry = _cache.get(path)
+    return entry is not None and entry["mtime"] == os.stat(path).st_mtime_ns
+
+
+def _read(path, mtime):
+    started = time.perf_counter()
+    digest = workbook_hash(path)
+    hashed = time.perf_counter()
+    loaded = read_snapshot(path, digest)
+    source = "snapshot"
+    if loaded is None:
+        # Индексы ставок, собранные для нового снимка, сразу идут в кеш
+        sheets, issues, tables, _ = compile_snapshot(path, digest)
+        source = "openpyxl"
+    else:
+        sheets, issues, tables = loaded
+    _track(tables)
+    parsed = time.perf_counter()
+    return {
+        "mtime": mtime,
+        "sha256": digest,
+        "fingerprints": sheet_fingerprints(path),
+        "sheets": sheets,
+        # Нечитаемые ячейки числовых колонок (см. normalize.py)
+        "issues": issues,
+        # Индексы ставок (из снимка или собранные для него); остальные таблицы — при первом обращении
+        "tables": tables,
+        # Сколько заняло чтение книги: load — файл и хеш, parse — снимок или openpyxl
+        "stats": {"load": hashed - started, "parse": parsed - hashed, "source": source},
+    }
+
+
+def _reload(path, mtime, old):
+    """Новая версия книги на основе старой: разбираются только изменённые листы."""
+    started = time.perf_counter()
+    digest = workbook_hash(path)
+    if digest == old["sha256"]:
+        # Файл перезаписан тем же содержимым
+        return {**old, "mtime": mtime}
+    fingerprints = sheet_fingerprints(path)
+    hashed = time.perf_counter()
+
+    loaded = read_snapshot(path, digest)
+    if loaded is not None:
+        # Снимок уже собран (например, другим процессом)
+        sheets, issues, built = loaded
+        source = "snapshot"
+    else:
+        names, shared = fingerprints
+        old_names, old_shared = old["fingerprints"]
+        if shared != old_shared:
+            stale = list(names)
+        else:
+            stale = [name for name in names if old_names.get(name) != names[name]]
+        fresh, fresh_issues = parse_sheets(path, stale) if stale else ({}, [])
+        sheets = {name: fresh[name] if name in fresh else old["sheets"][name] for name in names}
+        issues = [issue for issue in old["issues"] if issue["Лист"] not in fresh] + fresh_issues
+        source = f"openpyxl: {len(stale)} из {len(names)} листов"
+
+    changed = {
+        name for name in set(sheets) | set(old["sheets"])
+        if name not in sheets or name not in old["sheets"] or not sheets[name].equals(old["sheets"][name])
+    }
+    if loaded is None:
+        # Для снимка пересобираются только индексы изменившихся листов
+        built = {
+            name: table for name, table in old["tables"].items()
+            if name in BUILDERS and not changed.intersection(SHEETS[name])
+        }
+        built.update(build_tables(sheets, [name for name in BUILDERS if name not in built]))
+        write_snapshot(path, digest, sheets, issues, built)
+    parsed = time.perf_counter()
+
+    tables = {
+        name: table for name, table in old["tables"].items()
+        if _deps.get(name) is not None and not changed.intersection(_deps[name])
+    }
+    # Индексы ставок изменившихся листов уже построены для снимка
+    _track(built)
+    tables = {**built, **tables}
+    return {
+        "mtime": mtime,
+        "sha256": digest,
+        "fingerprints": fingerprints,
+        "sheets": sheets,
+        "issues": issues,
+        "tables": tables,
+        "stats": {
+            "load": hashed - started,
+            "parse": parsed - hashed,
+            "source": source,
+            "changed": sorted(changed),
+        },
+    }
+
+
+def _track(tables):
+    """Листы индексов ставок, пришедших из снимка (как их записал бы get_rate_table)."""
+    for name in tables:
+        _deps[name] = SHEETS[name]
+
+
+def start_watcher(path=WORKBOOK_PATH, interval=2.0):
+    """Фоновый поток, который перечитывает книгу сразу после замены файла.
+
+    Без него перезагрузка происходит при первом обращении после замены.
+    Повторный вызов для того же пути ничего не делает.
+    """
+    with _lock:
+        if path in _watchers:
+            return _watchers[path]
+        thread = threading.Thread(
+            target=_watch, args=(path, interval), name="workbook-watcher", daemon=True
+        )
+        _watchers[path] = thread
+    thread.start()
+    return thread
+
+
+def _watch(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            load_workbook(path)
+        except Exception:
+            # Файл может быть недописан в момент замены — попробуем на следующем шаге
+            pass
+
+
+def quality_issues(*sheet_names, path=WORKBOOK_PATH):
+    """Отчёт о нечитаемых ячейках: все листы или только перечисленные."""
+    issues = load_workbook(path)["issues"]
+    if sheet_names:
+        issues = [issue for issue in issues if issue["Лист"] in sheet_names]
+    return issues
+
+
+def get_table(name, build, path=WORKBOOK_PATH, sheets=None):
+    """Производная таблица: build(sheets) вызывается один раз на версию книги.
+
+    sheets — листы, из которых строится таблица: при замене книги она
+    пересобирается, только если изменился один из них (None — любой лист).
+    """
+    entry = load_workbook(path)
+    tables = entry["tables"]
+    if name not in tables:
+        with _lock:
+            _deps[name] = None if sheets is None else tuple(sheets)
+            if name not in tables:
+                with span("index", name):
+                    tables[name] = build(entry["sheets"])
+    return tables[name]
+
+
+def get_rate_table(name, path=WORKBOOK_PATH):
+    return get_table(name, BUILDERS[name], path, SHEETS[name])
+
+
+def memory_report(path=WORKBOOK_PATH):
+    """Байты каждого листа и таблицы кеша книги: [{"Объект", "Вид", "Строк", "Байт"}, ...].
+
+    Байты считаются с содержимым (строки, массивы, вложенные контейнеры).
+    Объекты, общие для нескольких таблиц (интернированные строки ключей),
+    входят в байты каждой из них, а в строку «Итого» — один раз.
+    """
+    entry = load_workbook(path)
+    objects = [("лист", name, df) for name, df in entry["sheets"].items()]
+    objects += [("таблица", name, table) for name, table in entry["tables"].items()]
+    rows = []
+    for kind, name, obj in objects:
+        rows.append({"Объект": name, "Вид": kind, "Строк": len(obj), "Байт": _sizeof(obj, set())})
+    seen = set()
+    total = sum(_sizeof(obj, seen) for _, _, obj in objects)
+    rows.append({"Объект": "Итого", "Вид": "", "Строк": sum(row["Строк"] for row in rows), "Байт": total})
+    return rows
+
+
+def _sizeof(obj, seen):
+    """Размер объекта с содержимым; seen — уже посчитанные объекты (id)."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        # DataFrame: pandas сам считает строки в колонках (deep=True)
+        return int(obj.memory_usage(deep=True).sum())
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):
+        return sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj) + obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(_sizeof(getattr(obj, attr), seen) for attr in obj.__slots__ if hasattr(obj, attr))
+    elif hasattr(obj, "__dict__"):
+        size += _sizeof(vars(obj), seen)
+    return size